@@ -0,0 +1,43 @@
+# Latency check for AlertService with a stub audio sink standing in for playsound.
+# Run from the repository root: python devel/bench_alerts.py
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.alert_service import AlertService
+
+class StubSink:
+    def __init__(self, play_time):
+        self.play_time = play_time
+        self.played = []
+
+    def __call__(self, sound_path):
+        self.played.append((time.monotonic(), sound_path))
+        time.sleep(self.play_time)
+
+def run(frames=300, frame_interval=1 / 30, play_time=0.5):
+    sink = StubSink(play_time)
+    service = AlertService('alert_sound.wav', sink=sink, cooldown=1.0)
+    service.start()
+
+    # Simulate the live loop re-triggering on every frame while the eyes are missing,
+    # escalating the level as update_tracking does
+    trigger_times = []
+    for frame in range(frames):
+        level = 1 if frame < 100 else 2 if frame < 200 else 3
+        start = time.perf_counter()
+        service.trigger(level)
+        trigger_times.append(time.perf_counter() - start)
+        time.sleep(frame_interval)
+    service.stop(timeout=5.0)
+
+    trigger_times.sort()
+    stats = service.get_stats()
+    print(f"trigger() cost: mean {sum(trigger_times) * 1e6 / len(trigger_times):.1f} us, max {trigger_times[-1] * 1e6:.1f} us")
+    print(f"dispatch latency: mean {stats['dispatch_latency_ms']['mean']:.2f} ms, max {stats['dispatch_latency_ms']['max']:.2f} ms")
+    print(f"sink calls: {len(sink.played)}, stats: {stats}")
+    assert trigger_times[-1] < frame_interval, "trigger() must never stall the frame loop"
+
+if __name__ == "__main__":
+    run()
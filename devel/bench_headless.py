@@ -0,0 +1,56 @@
+# Headless benchmark: run MonitoringEngine over a recorded video with no window and no display.
+# Run from the repository root: python devel/bench_headless.py path/to/drive.mp4 [max_frames]
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.face_detector import FaceDetector
+from core.eye_tracker import EyeTracker
+from core.identity_verifier import IdentityVerifier
+from core.monitoring_engine import MonitoringEngine
+from core.car_calibration import load_calibration_data
+from utils.engagement_rate import GazeZoneClassifier
+
+def run(video_path, max_frames=None):
+    face_detector = FaceDetector(pyramid_downscale=2)
+    eye_tracker = EyeTracker()
+    user_calibration_path = 'src/data/user_calibration.npz'
+    user_face_descriptor = np.load(user_calibration_path)['face_descriptor'] if os.path.exists(user_calibration_path) else None
+    calibration_points = load_calibration_data()
+    engine = MonitoringEngine(face_detector, eye_tracker, IdentityVerifier(face_detector),
+                              zone_classifier=GazeZoneClassifier(calibration_points) if calibration_points is not None else None,
+                              user_face_descriptor=user_face_descriptor)
+
+    cap = cv2.VideoCapture(video_path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    latencies = []
+    zones = {}
+    start = time.perf_counter()
+    while max_frames is None or len(latencies) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frame_start = time.perf_counter()
+        result = engine.process(frame, timestamp=len(latencies) / fps)
+        latencies.append(time.perf_counter() - frame_start)
+        zones[result.gaze_zone] = zones.get(result.gaze_zone, 0) + 1
+    elapsed = time.perf_counter() - start
+    cap.release()
+
+    if not latencies:
+        print(f"No frames read from {video_path}")
+        return
+    latencies = np.array(latencies) * 1000
+    print(f"{len(latencies)} frames in {elapsed:.2f} s: {len(latencies) / elapsed:.1f} fps")
+    print(f"per-frame latency: p50 {np.percentile(latencies, 50):.2f} ms, p95 {np.percentile(latencies, 95):.2f} ms")
+    print(f"gaze zones: {zones}")
+    print(f"identity verification: {engine.identity_verifier.get_stats()}")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python devel/bench_headless.py VIDEO [MAX_FRAMES]")
+        sys.exit(1)
+    run(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else None)
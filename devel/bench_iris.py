@@ -0,0 +1,76 @@
+# Micro-benchmark: ROI-first IrisLocator against the original full-frame get_iris_position.
+# Run from the repository root: python devel/bench_iris.py
+import os
+import sys
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.iris import IrisLocator
+
+def get_iris_position(eye_region, frame, gray):
+    # Original implementation, minus the cv2.imshow of the 10x debug image
+    mask = np.zeros((frame.shape[0], frame.shape[1]), dtype=np.uint8)
+    cv2.fillPoly(mask, [np.array(eye_region, dtype=np.int32)], 255)
+    eye = cv2.bitwise_and(gray, gray, mask=mask)
+
+    min_x = np.min(np.array(eye_region)[:, 0])
+    max_x = np.max(np.array(eye_region)[:, 0])
+    min_y = np.min(np.array(eye_region)[:, 1])
+    max_y = np.max(np.array(eye_region)[:, 1])
+    eye = eye[min_y:max_y, min_x:max_x]
+
+    eye = cv2.equalizeHist(eye)
+    threshold = cv2.adaptiveThreshold(eye, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
+
+    mask_eye = mask[min_y:max_y, min_x:max_x]
+    eye_masked = cv2.bitwise_and(threshold, threshold, mask=mask_eye)
+
+    contours, _ = cv2.findContours(eye_masked, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+    contours = sorted(contours, key=lambda x: cv2.contourArea(x), reverse=True)
+
+    if contours:
+        cnt = contours[0]
+        (x, y, w, h) = cv2.boundingRect(cnt)
+        iris_position = (x + int(w / 2), y + int(h / 2))
+        return (iris_position[0] + min_x, iris_position[1] + min_y)
+    return None
+
+def make_frame(width, height, rng):
+    frame = rng.integers(90, 200, size=(height, width, 3), dtype=np.uint8)
+    eyes = []
+    for cx in (width // 2 - 60, width // 2 + 60):
+        cy = height // 2
+        cv2.circle(frame, (cx + int(rng.integers(-4, 5)), cy), 7, (20, 20, 20), -1)
+        eyes.append([(cx - 18, cy), (cx - 8, cy - 7), (cx + 8, cy - 7), (cx + 18, cy), (cx + 8, cy + 7), (cx - 8, cy + 7)])
+    return frame, eyes
+
+def run(width=1920, height=1080, frames=200):
+    rng = np.random.default_rng(0)
+    samples = [make_frame(width, height, rng) for _ in range(20)]
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame, _ in samples]
+    locator = IrisLocator()
+
+    for (frame, eyes), gray in zip(samples, grays):
+        for eye in eyes:
+            assert get_iris_position(eye, frame, gray) == locator.locate(eye, gray)
+
+    timings = {}
+    for name, locate in (('original', lambda eye, frame, gray: get_iris_position(eye, frame, gray)),
+                         ('roi_first', lambda eye, frame, gray: locator.locate(eye, gray))):
+        start = time.perf_counter()
+        for i in range(frames):
+            frame, eyes = samples[i % len(samples)]
+            gray = grays[i % len(grays)]
+            for eye in eyes:
+                locate(eye, frame, gray)
+        timings[name] = (time.perf_counter() - start) * 1000 / frames
+
+    print(f"Frame size {width}x{height}, {frames} frames, 2 eyes per frame")
+    for name, ms in timings.items():
+        print(f"{name}: {ms:.3f} ms/frame")
+    print(f"Speed-up: {timings['original'] / timings['roi_first']:.1f}x")
+
+if __name__ == "__main__":
+    run()
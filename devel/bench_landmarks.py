@@ -0,0 +1,57 @@
+# Micro-benchmark: per-frame Python overhead of reading 68 dlib landmarks with .part(n).x/.y
+# against a single shape_to_np conversion plus array slicing.
+# Run from the repository root: python devel/bench_landmarks.py
+import os
+import sys
+import time
+import dlib
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.landmarks import shape_to_np, LEFT_EYE, RIGHT_EYE
+
+def per_part_access(landmarks):
+    # What one frame used to cost: both eye regions, the calibration position check and the overlay loop
+    left_eye = np.array([(landmarks.part(n).x, landmarks.part(n).y) for n in range(36, 42)])
+    right_eye = np.array([(landmarks.part(n).x, landmarks.part(n).y) for n in range(42, 48)])
+    eye_distance = ((landmarks.part(36).x - landmarks.part(45).x) ** 2 + (landmarks.part(36).y - landmarks.part(45).y) ** 2) ** 0.5
+    face_width = landmarks.part(16).x - landmarks.part(0).x
+    overlay = [(landmarks.part(n).x, landmarks.part(n).y) for n in range(0, 68)]
+    return left_eye, right_eye, eye_distance, face_width, overlay
+
+def array_access(landmarks):
+    points = shape_to_np(landmarks)
+    left_eye = points[LEFT_EYE]
+    right_eye = points[RIGHT_EYE]
+    eye_distance = np.linalg.norm(points[36] - points[45])
+    face_width = points[16, 0] - points[0, 0]
+    overlay = points.tolist()
+    return left_eye, right_eye, eye_distance, face_width, overlay
+
+def make_shape(rng):
+    coords = rng.integers(100, 500, size=(68, 2))
+    parts = dlib.points()
+    for x, y in coords:
+        parts.append(dlib.point(int(x), int(y)))
+    return dlib.full_object_detection(dlib.rectangle(100, 100, 500, 500), parts)
+
+def run(frames=5000):
+    rng = np.random.default_rng(0)
+    shapes = [make_shape(rng) for _ in range(frames)]
+    for shape in shapes[:10]:
+        old, new = per_part_access(shape), array_access(shape)
+        assert np.array_equal(old[0], new[0]) and np.array_equal(old[1], new[1]) and old[3] == new[3]
+
+    timings = {}
+    for name, extract in (('part_access', per_part_access), ('shape_to_np', array_access)):
+        start = time.perf_counter()
+        for shape in shapes:
+            extract(shape)
+        timings[name] = (time.perf_counter() - start) * 1e6 / frames
+
+    for name, us in timings.items():
+        print(f"{name}: {us:.1f} us/frame")
+    print(f"Python overhead removed: {timings['part_access'] - timings['shape_to_np']:.1f} us/frame")
+
+if __name__ == "__main__":
+    run()
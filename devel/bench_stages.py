@@ -0,0 +1,302 @@
+# Stage benchmark suite: times each perception stage and the full update_tracking path on a fake camera,
+# reports p50/p95/p99 latency and throughput, and compares against stored JSON baselines.
+# Run from the repository root:
+#   python devel/bench_stages.py [--video drive.mp4] [--save-baseline] [--tolerance 0.2]
+# Exits with status 1 when a stage is slower than its baseline by more than the tolerance.
+# Stages whose models or libraries are missing are reported as skipped.
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+default_baseline_path = os.path.join(os.path.dirname(__file__), 'baselines', 'stages.json')
+sample_clip_path = os.path.join(os.path.dirname(__file__), '..', 'src', 'data', 'detector_sample.mp4')
+
+class FakeCamera:
+    # Stands in for core.camera.Camera: cycles through preloaded frames, never blocks
+    def __init__(self, frames):
+        self.frames = frames
+        self.index = 0
+        self.last_frame_timestamp = None
+
+    def open(self):
+        pass
+
+    def get_frame(self, timeout=0.5):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        self.last_frame_timestamp = time.monotonic()
+        return frame
+
+    def frame_processed(self):
+        pass
+
+    def get_stats(self):
+        return {'frames_consumed': self.index}
+
+    def release(self):
+        pass
+
+def make_frame(width, height, rng):
+    # Noise background with two dark iris blobs; eyes are (6, 2) landmark polygons around them
+    frame = rng.integers(90, 200, size=(height, width, 3), dtype=np.uint8)
+    eyes = []
+    for cx in (width // 2 - 60, width // 2 + 60):
+        cy = height // 2
+        cv2.circle(frame, (cx + int(rng.integers(-4, 5)), cy), 7, (20, 20, 20), -1)
+        eyes.append(np.array([(cx - 18, cy), (cx - 8, cy - 7), (cx + 8, cy - 7), (cx + 18, cy), (cx + 8, cy + 7), (cx - 8, cy + 7)]))
+    return frame, eyes
+
+def load_frames(video_path=None, count=60, width=640, height=480):
+    path = video_path or (sample_clip_path if os.path.exists(sample_clip_path) else None)
+    if path is not None:
+        frames = []
+        cap = cv2.VideoCapture(path)
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if frames:
+            return frames, path
+    rng = np.random.default_rng(0)
+    return [make_frame(width, height, rng)[0] for _ in range(count)], 'synthetic'
+
+def fallback_face(frame):
+    height, width = frame.shape[:2]
+    return np.array([width // 3, height // 4, width // 3, height // 2], dtype=np.int32)
+
+def synthetic_calibration(rng):
+    zones = ['rearview_mirror', 'left_side_mirror', 'right_side_mirror', 'dashboard']
+    points = {zone: [rng.uniform(0, 640, (6, 2)), rng.uniform(0, 640, (6, 2))] for zone in zones}
+    points['road'] = [[rng.uniform(0, 640, (6, 2)), rng.uniform(0, 640, (6, 2))] for _ in range(4)]
+    return points
+
+class FakeResult:
+    def __init__(self, timestamp, zone, ear):
+        self.timestamp = timestamp
+        self.gaze_zone = zone
+        self.eyes_valid = zone is not None
+        self.ear = ear
+
+def build_stages(frames):
+    # name -> (setup, run); setup returns per-stage state, run(state, i) is one timed call
+    def face_detector_setup(track_faces):
+        def setup():
+            from core.face_detector import FaceDetector
+            return {'detector': FaceDetector(pyramid_downscale=2, track_faces=track_faces)}
+        return setup
+
+    def detect(state, i):
+        from core.frame_context import FrameContext
+        frame = frames[i % len(frames)]
+        state['detector'].detect_face(frame, FrameContext(frame, i))
+
+    def dlib_setup():
+        from core.face_detector import FaceDetector
+        from core.eye_tracker import EyeTracker
+        from core.frame_context import FrameContext
+        detector = FaceDetector(pyramid_downscale=2)
+        faces = []
+        for frame in frames:
+            face = detector.detect_face(frame, FrameContext(frame))
+            faces.append(face if face is not None else fallback_face(frame))
+        descriptor = detector.get_face_descriptor(frames[0], faces[0])
+        return {'detector': detector, 'eye_tracker': EyeTracker(), 'faces': faces, 'descriptor': descriptor}
+
+    def recognize(state, i):
+        from core.frame_context import FrameContext
+        frame = frames[i % len(frames)]
+        state['detector'].recognize_user_face(frame, state['faces'][i % len(frames)], state['descriptor'], FrameContext(frame, i))
+
+    def track_eyes(state, i):
+        from core.frame_context import FrameContext
+        frame = frames[i % len(frames)]
+        state['eye_tracker'].track_eyes(frame, state['faces'][i % len(frames)], FrameContext(frame, i), draw=False)
+
+    def iris_setup():
+        from core.iris import IrisLocator
+        rng = np.random.default_rng(1)
+        samples = [make_frame(640, 480, rng) for _ in range(20)]
+        return {'locator': IrisLocator(), 'samples': [(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), eyes) for frame, eyes in samples]}
+
+    def iris(state, i):
+        gray, eyes = state['samples'][i % len(state['samples'])]
+        for eye in eyes:
+            state['locator'].locate(eye, gray)
+
+    def engagement_rate_setup():
+        rng = np.random.default_rng(2)
+        return {'calibration': synthetic_calibration(rng), 'eyes': [rng.uniform(0, 640, (2, 6, 2)) for _ in range(64)]}
+
+    def engagement_rate(state, i):
+        from utils.engagement_rate import calculate_engagement_rate
+        calculate_engagement_rate(state['eyes'][i % 64], state['calibration'])
+
+    def metrics_report_setup():
+        from utils.engagement_rate import new_engagement_data
+        engagement_data = new_engagement_data()
+        engagement_data.update(road=5400, dashboard=300, rearview_mirror=120, other=80)
+        return {'engagement_data': engagement_data, 'path': os.path.join(tempfile.mkdtemp(), 'report_data.json')}
+
+    def metrics_report(state, i):
+        from utils.metrics_report import generate_metrics_report
+        generate_metrics_report(state['engagement_data'], 200.0, 6000, report_file_path=state['path'],
+                                make_charts=False, verbose=False)
+
+    def accumulator_setup():
+        from utils.metrics_accumulator import MetricsAccumulator
+        zones = ['road'] * 20 + ['dashboard'] * 5 + [None] * 3 + ['left_side_mirror'] * 4
+        return {'metrics': MetricsAccumulator(),
+                'results': [FakeResult(i / 30, zones[i % len(zones)], 0.3) for i in range(3000)]}
+
+    def accumulator(state, i):
+        state['metrics'].update(state['results'][i % 3000])
+
+    def drowsiness_setup():
+        from core.drowsiness import DrowsinessMonitor
+        rng = np.random.default_rng(3)
+        return {'monitor': DrowsinessMonitor(), 'ears': rng.uniform(0.1, 0.35, 3000)}
+
+    def drowsiness(state, i):
+        state['monitor'].update(float(state['ears'][i % 3000]), i / 30)
+
+    def update_tracking_setup():
+        from core.main_core import DriverMonitoringSystem
+        from core.car_calibration import load_calibration_data
+        from utils.engagement_rate import GazeZoneClassifier
+        dms = DriverMonitoringSystem(headless=True, pipelined=False)
+        dms.camera = FakeCamera(frames)
+        calibration_points = load_calibration_data() or synthetic_calibration(np.random.default_rng(4))
+        dms.zone_classifier = GazeZoneClassifier(calibration_points)
+        dms.engine.zone_classifier = dms.zone_classifier
+        dms.alert_service.sink = lambda sound_path: None
+        dms.alert_service.start()
+        dms.is_tracking = True
+        return {'dms': dms}
+
+    def update_tracking(state, i):
+        state['dms'].update_tracking()
+
+    return {
+        'detect_face': (face_detector_setup(False), detect),
+        'detect_face_tracked': (face_detector_setup(True), detect),
+        'recognize_user_face': (dlib_setup, recognize),
+        'track_eyes': (dlib_setup, track_eyes),
+        'get_iris_position': (iris_setup, iris),
+        'calculate_engagement_rate': (engagement_rate_setup, engagement_rate),
+        'generate_metrics_report': (metrics_report_setup, metrics_report),
+        'metrics_accumulator_update': (accumulator_setup, accumulator),
+        'drowsiness_update': (drowsiness_setup, drowsiness),
+        'update_tracking': (update_tracking_setup, update_tracking),
+    }
+
+def summarize(samples):
+    values = np.array(samples) * 1000
+    return {
+        'p50_ms': float(np.percentile(values, 50)),
+        'p95_ms': float(np.percentile(values, 95)),
+        'p99_ms': float(np.percentile(values, 99)),
+        'mean_ms': float(values.mean()),
+        'throughput_per_s': float(1000 / values.mean()) if values.mean() > 0 else 0.0,
+        'iterations': len(values),
+    }
+
+def run_stage(setup, run, iterations, warmup):
+    state = setup()
+    for i in range(warmup):
+        run(state, i)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        run(state, warmup + i)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+def compare(results, baseline, tolerance, slack_ms):
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get('stages', {}).get(name)
+        if base is None:
+            continue
+        for key in ('p50_ms', 'p95_ms'):
+            limit = base[key] * (1 + tolerance) + slack_ms
+            if result[key] > limit:
+                regressions.append(f"{name} {key}: {result[key]:.3f} ms > {limit:.3f} ms (baseline {base[key]:.3f} ms)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the perception stages against stored baselines.")
+    parser.add_argument('--video', help="clip to take frames from (default: src/data/detector_sample.mp4 or synthetic)")
+    parser.add_argument('--frames', type=int, default=60)
+    parser.add_argument('--iterations', type=int, default=300)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--stages', nargs='*', help="only run these stages")
+    parser.add_argument('--baseline', default=default_baseline_path)
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="allowed relative slowdown before failing")
+    parser.add_argument('--slack-ms', type=float, default=0.05, help="absolute slack added to every limit")
+    parser.add_argument('--output', help="also write this run's results as JSON")
+    args = parser.parse_args()
+
+    frames, source = load_frames(args.video, args.frames)
+    print(f"Frames: {len(frames)} from {source}, {frames[0].shape[1]}x{frames[0].shape[0]}")
+    stages = build_stages(frames)
+    results = {}
+    skipped = {}
+    for name, (setup, run) in stages.items():
+        if args.stages and name not in args.stages:
+            continue
+        try:
+            results[name] = run_stage(setup, run, args.iterations, args.warmup)
+        except (ImportError, FileNotFoundError, RuntimeError) as e:
+            skipped[name] = str(e)
+            print(f"{name}: skipped ({e})")
+            continue
+        r = results[name]
+        print(f"{name}: p50 {r['p50_ms']:.3f} ms, p95 {r['p95_ms']:.3f} ms, p99 {r['p99_ms']:.3f} ms, "
+              f"{r['throughput_per_s']:.0f}/s")
+
+    run_data = {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'machine': {'platform': platform.platform(), 'processor': platform.processor(), 'python': platform.python_version()},
+        'source': source,
+        'stages': results,
+        'skipped': skipped,
+    }
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(run_data, output_file, indent=2)
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(args.baseline) or '.', exist_ok=True)
+        with open(args.baseline, 'w') as baseline_file:
+            json.dump(run_data, baseline_file, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --save-baseline on the target hardware first.")
+        return 0
+    with open(args.baseline) as baseline_file:
+        baseline = json.load(baseline_file)
+    if baseline.get('machine', {}).get('platform') != run_data['machine']['platform']:
+        print(f"Warning: baseline was recorded on {baseline.get('machine', {}).get('platform')}")
+    regressions = compare(results, baseline, args.tolerance, args.slack_ms)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions:
+        return 1
+    print(f"No stage regressed by more than {args.tolerance:.0%}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+# Startup benchmark: import time of the login screen's modules and login-screen time-to-interactive.
+# Each measurement runs in a fresh interpreter. Run from the repository root: python devel/bench_startup.py
+import json
+import os
+import subprocess
+import sys
+
+src_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+
+PROBE = r'''
+import json
+import sys
+import time
+t0 = time.perf_counter()
+
+import cv2
+opened = []
+original_capture = cv2.VideoCapture
+def tracking_capture(*args, **kwargs):
+    opened.append(args)
+    return original_capture(*args, **kwargs)
+cv2.VideoCapture = tracking_capture
+
+from ui.main_ui import MainApp
+t_import = time.perf_counter()
+
+result = {'import_s': t_import - t0, 'camera_opened_on_import': len(opened)}
+try:
+    import wx
+    app = wx.App(False)
+    from ui.login_frame import LoginFrame
+    frame = LoginFrame(None, "Login")
+    frame.Show()
+    def interactive():
+        result['time_to_interactive_s'] = time.perf_counter() - t0
+        result['camera_opened_before_login'] = len(opened)
+        frame.Destroy()
+        app.ExitMainLoop()
+    wx.CallAfter(interactive)
+    app.MainLoop()
+except Exception as e:
+    result['ui_error'] = str(e)
+print(json.dumps(result))
+'''
+
+def run(repeats=3):
+    env = dict(os.environ, PYTHONPATH=src_dir + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    samples = []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, '-c', PROBE], capture_output=True, text=True, env=env,
+                                cwd=os.path.join(src_dir, '..'))
+        if output.returncode != 0:
+            print(output.stderr)
+            return
+        samples.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    for key in ('import_s', 'time_to_interactive_s'):
+        values = [sample[key] for sample in samples if key in sample]
+        if values:
+            print(f"{key}: best {min(values):.3f} s, mean {sum(values) / len(values):.3f} s")
+    print(f"camera opened during import: {samples[-1]['camera_opened_on_import']}")
+    if 'camera_opened_before_login' in samples[-1]:
+        print(f"camera opened before the login screen was interactive: {samples[-1]['camera_opened_before_login']}")
+    if 'ui_error' in samples[-1]:
+        print(f"login screen not measured: {samples[-1]['ui_error']}")
+
+if __name__ == "__main__":
+    run()
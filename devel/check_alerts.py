@@ -0,0 +1,104 @@
+# Behaviour checks for AlertService (dedup, cooldown, escalation) with a stub sink; no audio is played.
+# Run from the repository root: python devel/check_alerts.py
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.alert_service import AlertService
+
+class GatedSink:
+    # Blocks in the sink until release(), so a test controls exactly when a sound "finishes"
+    def __init__(self):
+        self.played = []
+        self.started = threading.Event()
+        self._gate = threading.Event()
+
+    def __call__(self, sound_path):
+        self.played.append(sound_path)
+        self.started.set()
+        self._gate.wait(timeout=5.0)
+
+    def release(self):
+        self._gate.set()
+
+def make_service(sink, cooldown=0.2):
+    service = AlertService('level1.wav', sink=sink, cooldown=cooldown,
+                           level_sounds={2: 'level2.wav', 3: 'level3.wav'}, level_repeats={1: 1, 2: 1, 3: 1})
+    service.start()
+    return service
+
+def wait_idle(service, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while service.pending() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert service.pending() == 0, "alert did not finish"
+
+def check_duplicates_dropped():
+    sink = GatedSink()
+    service = make_service(sink)
+    assert service.trigger(1)
+    sink.started.wait(1.0)
+    assert not service.trigger(1), "same level while playing must be dropped"
+    assert not service.trigger(1, key='eyes_missing'), "same key while playing must be dropped"
+    assert service.trigger(1, key='microsleep'), "another key is independent"
+    sink.release()
+    wait_idle(service)
+    service.stop()
+    assert service.get_stats()['suppressed_duplicate'] == 2
+    assert sink.played == ['level1.wav', 'level1.wav']
+
+def check_cooldown():
+    sink = GatedSink()
+    sink.release()
+    service = make_service(sink, cooldown=0.2)
+    assert service.trigger(1)
+    wait_idle(service)
+    assert not service.trigger(1), "same level within cooldown must be held back"
+    time.sleep(0.25)
+    assert service.trigger(1), "same level after cooldown plays again"
+    wait_idle(service)
+    service.clear()
+    assert service.trigger(1), "clear() resets the cooldown"
+    wait_idle(service)
+    service.stop()
+    assert service.get_stats()['suppressed_cooldown'] == 1
+    assert len(sink.played) == 3
+
+def check_escalation():
+    sink = GatedSink()
+    service = make_service(sink)
+    assert service.trigger(1)
+    sink.started.wait(1.0)
+    # Level 1 is playing: 2 is queued behind it, then 3 supersedes the still-queued 2
+    assert service.trigger(2), "a higher level must get through while a lower one plays"
+    assert service.trigger(3), "a higher level must get through while a lower one is queued"
+    assert not service.trigger(2), "a lower level than the active one is a duplicate"
+    sink.release()
+    wait_idle(service)
+    stats = service.get_stats()
+    assert sink.played == ['level1.wav', 'level3.wav'], sink.played
+    assert stats['escalated'] == 2 and stats['superseded'] == 1, stats
+    # Within cooldown, a higher level still gets through, a lower or equal one does not
+    assert not service.trigger(3)
+    assert not service.trigger(1)
+    service.stop()
+
+def check_restart_while_playing():
+    sink = GatedSink()
+    service = make_service(sink)
+    service.trigger(1)
+    sink.started.wait(1.0)
+    service.stop(timeout=0.05)
+    service.start()
+    sink.release()
+    assert service.trigger(1, key='microsleep')
+    wait_idle(service)
+    service.stop()
+    assert sink.played.count('level1.wav') == 2
+
+if __name__ == "__main__":
+    for check in (check_duplicates_dropped, check_cooldown, check_escalation, check_restart_while_playing):
+        check()
+        print(f"{check.__name__}: ok")
@@ -4,10 +4,16 @@ import numpy as np
 import pandas as pd
 import time
 import os
+import sys
 from playsound import playsound
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+from core.iris import IrisLocator
+from core.landmarks import shape_to_np
+from core.pyramid import detect_faces
+
 class EyeTracker:
-    def __init__(self, predictor_path, video_source=0):
+    def __init__(self, predictor_path, video_source=0, detection_downscale=1):
         self.predictor_path = predictor_path
         self.detector = dlib.get_frontal_face_detector()
         self.predictor = dlib.shape_predictor(predictor_path)
@@ -18,50 +24,29 @@ class EyeTracker:
         self.standard_distance_centers = None
         self.standard_screen_distance = 50
         self.alert_sound_path = os.path.join(os.path.dirname(__file__), '..', 'utils', 'alert_sound.wav')
+        self.detection_downscale = detection_downscale
+        self.iris_locator = IrisLocator()
 
 
     def midpoint(self, point1, point2):
         return (int((point1[0] + point2[0]) / 2), int((point1[1] + point2[1]) / 2))
 
     def get_eye_region(self, landmarks, eye_points):
-        return [(landmarks.part(point).x, landmarks.part(point).y) for point in eye_points]
+        return shape_to_np(landmarks)[eye_points]
 
     def get_eye_center(self, landmarks, eye_points):
-        eye_region = [(landmarks.part(point).x, landmarks.part(point).y) for point in eye_points]
+        eye_region = self.get_eye_region(landmarks, eye_points)
         eye_center = self.midpoint(eye_region[0], eye_region[3])
         return eye_center
 
     def get_iris_position(self, eye_region, frame, gray):
-        mask = np.zeros((frame.shape[0], frame.shape[1]), dtype=np.uint8)
-        cv2.fillPoly(mask, [np.array(eye_region, dtype=np.int32)], 255)
-        eye = cv2.bitwise_and(gray, gray, mask=mask)
-        
-        min_x = np.min(np.array(eye_region)[:, 0])
-        max_x = np.max(np.array(eye_region)[:, 0])
-        min_y = np.min(np.array(eye_region)[:, 1])
-        max_y = np.max(np.array(eye_region)[:, 1])
-        eye = eye[min_y:max_y, min_x:max_x]
-        
-        eye = cv2.equalizeHist(eye)
-        threshold = cv2.adaptiveThreshold(eye, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
-        mask_eye = mask[min_y:max_y, min_x:max_x]
-        eye_masked = cv2.bitwise_and(threshold, threshold, mask=mask_eye)
-        
-        contours, _ = cv2.findContours(eye_masked, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-        contours = sorted(contours, key=lambda x: cv2.contourArea(x), reverse=True)
-
-        if contours:
-            cnt = contours[0]
-            (x, y, w, h) = cv2.boundingRect(cnt)
-            iris_position = (x + int(w / 2), y + int(h / 2))
-            return (iris_position[0] + min_x, iris_position[1] + min_y)
-        return None
+        return self.iris_locator.locate(eye_region, gray)
 
     def get_eye_to_eye_distance(self):
         while True:
             _, frame = self.cap.read()
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.detector(gray)
+            faces = detect_faces(self.detector, gray, self.detection_downscale)
             
             for face in faces:
                 landmarks = self.predictor(gray, face)
@@ -88,7 +73,7 @@ class EyeTracker:
             while True:
                 _, frame = self.cap.read()
                 gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                faces = self.detector(gray)
+                faces = detect_faces(self.detector, gray, self.detection_downscale)
                 cv2.putText(frame, f"Look at point: {point}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
                 cv2.imshow("Calibration", frame)
                 key = cv2.waitKey(1)
@@ -158,7 +143,7 @@ class EyeTracker:
         while True:
             _, frame = self.cap.read()
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = self.detector(gray)
+            faces = detect_faces(self.detector, gray, self.detection_downscale)
             eyes_detected = False
 
             for face in faces:
@@ -0,0 +1,35 @@
+# src/batch_process.py
+# Re-score recorded videos offline: python src/batch_process.py VIDEO_OR_DIR [...] --output-dir src/data/batch
+
+import argparse
+from core.batch_processor import BatchProcessor, build_engine, find_videos
+from core.batch_pool import BatchPool
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Run the driver monitoring pipeline over recorded video files.")
+    parser.add_argument('videos', nargs='+', help="video files or directories containing videos")
+    parser.add_argument('--output-dir', default='src/data/batch', help="where per-video results are written")
+    parser.add_argument('--backend', default='haar', help="face detector backend ('auto' benchmarks the sample clip)")
+    parser.add_argument('--downscale', type=int, default=2, help="pyramid downscale used for face detection")
+    parser.add_argument('--no-identity', action='store_true', help="treat every detected face as the driver")
+    parser.add_argument('--no-frames', action='store_true', help="only write the metrics report, not per-frame results")
+    parser.add_argument('--charts', action='store_true', help="also render the engagement charts for each video")
+    parser.add_argument('--workers', type=int, default=1, help="worker processes; 0 uses every core")
+    parser.add_argument('--chunk-seconds', type=float, default=300, help="split longer videos into chunks of this length")
+    parser.add_argument('--memory-budget-mb', type=int, default=None, help="cap the worker count to fit this much memory")
+    parser.add_argument('--max-frames', type=int, default=None, help="stop each video after this many frames")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    engine_options = {'backend': args.backend, 'pyramid_downscale': args.downscale, 'verify_identity': not args.no_identity}
+    videos = find_videos(args.videos)
+    if args.workers == 1:
+        processor = BatchProcessor(build_engine(**engine_options), output_dir=args.output_dir,
+                                   write_frames=not args.no_frames, charts=args.charts)
+        processor.run(videos, max_frames=args.max_frames)
+    else:
+        pool = BatchPool(engine_options, output_dir=args.output_dir, write_frames=not args.no_frames, charts=args.charts,
+                         workers=args.workers or None, memory_budget_mb=args.memory_budget_mb,
+                         chunk_seconds=args.chunk_seconds)
+        pool.run(videos, max_frames=args.max_frames)
@@ -0,0 +1,132 @@
+import queue
+import threading
+import time
+from collections import deque
+from core import tracing
+
+ALERT_LEVELS = {1: 'warning', 2: 'alert', 3: 'critical'}
+
+def playsound_sink(sound_path):
+    from playsound import playsound
+    playsound(sound_path)
+
+class AlertService:
+    # Plays alerts on a worker thread so the perception loop never waits on audio.
+    # Triggers at or below the level already queued or playing for a key are dropped, repeats of the
+    # same level are held back for cooldown seconds, and a higher level always gets through, superseding
+    # the lower one.
+    def __init__(self, sound_path, sink=None, cooldown=2.0, level_sounds=None, level_repeats=None, stats_window=100):
+        self.sound_path = sound_path
+        self.sink = sink or playsound_sink
+        self.cooldown = cooldown
+        self.level_sounds = level_sounds or {}
+        self.level_repeats = level_repeats or {1: 1, 2: 2, 3: 3}
+        self.queue = queue.Queue()
+        self.latencies = deque(maxlen=stats_window)
+        self.stats = {'triggered': 0, 'played': 0, 'escalated': 0, 'superseded': 0, 'suppressed_duplicate': 0,
+                      'suppressed_cooldown': 0, 'errors': 0}
+        self._lock = threading.Lock()
+        self._active = {}
+        self._last_played = {}
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._thread is not None:
+            return
+        # Each worker gets its own queue, so a worker from a previous session still finishing a sound
+        # can neither take this session's alerts nor leave its stop sentinel for the new worker
+        self.queue = queue.Queue()
+        with self._lock:
+            self._active.clear()
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, args=(self.queue,), name="AlertService", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=1.0):
+        if self._thread is None:
+            return
+        self._running = False
+        # Alerts not yet played are discarded; the worker exits when it reaches the sentinel
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._thread = None
+        with self._lock:
+            self._active.clear()
+
+    def trigger(self, level=1, key='eyes_missing'):
+        now = time.monotonic()
+        with self._lock:
+            self.stats['triggered'] += 1
+            active_level = self._active.get(key)
+            if active_level is not None and level <= active_level:
+                self.stats['suppressed_duplicate'] += 1
+                return False
+            if active_level is not None:
+                # Escalation while a lower level is queued or playing: the lower one is superseded
+                # (skipped if still queued, cut short after its current repeat if playing)
+                self.stats['escalated'] += 1
+                self._active[key] = level
+                self.queue.put((key, level, now))
+                return True
+            last_time, last_level = self._last_played.get(key, (None, 0))
+            if last_time is not None and level <= last_level and now - last_time < self.cooldown:
+                self.stats['suppressed_cooldown'] += 1
+                return False
+            self._active[key] = level
+        self.queue.put((key, level, now))
+        return True
+
+    def clear(self, key='eyes_missing'):
+        # The condition is over, so the next trigger starts again from the lowest level
+        with self._lock:
+            self._last_played.pop(key, None)
+
+    def pending(self):
+        with self._lock:
+            return len(self._active)
+
+    def _worker(self, work_queue):
+        while True:
+            item = work_queue.get()
+            if item is None:
+                break
+            key, level, queued_at = item
+            if self._superseded(key, level):
+                self.stats['superseded'] += 1
+                continue
+            self.latencies.append(time.monotonic() - queued_at)
+            sound_path = self.level_sounds.get(level, self.sound_path)
+            try:
+                for _ in range(self.level_repeats.get(level, 1)):
+                    if self._superseded(key, level):
+                        break
+                    with tracing.span('alert_sink', key=key, level=level):
+                        self.sink(sound_path)
+                self.stats['played'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"Error playing alert sound: {e}")
+            with self._lock:
+                # A higher level queued meanwhile keeps the key active until it has played
+                if work_queue is self.queue and self._active.get(key) == level:
+                    self._active.pop(key, None)
+                    self._last_played[key] = (time.monotonic(), level)
+
+    def _superseded(self, key, level):
+        with self._lock:
+            return self._active.get(key, level) > level
+
+    def get_stats(self):
+        latencies = sorted(self.latencies)
+        stats = dict(self.stats)
+        stats['dispatch_latency_ms'] = {
+            'mean': sum(latencies) * 1000 / len(latencies) if latencies else 0.0,
+            'max': latencies[-1] * 1000 if latencies else 0.0,
+        }
+        return stats
@@ -0,0 +1,185 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+import cv2
+from core.batch_processor import BatchProcessor, build_engine
+from utils.engagement_rate import new_engagement_data
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# One processor per worker process, built by the pool initializer so the dlib models
+# are loaded once per worker instead of once per chunk
+_worker_processor = None
+
+def _init_worker(engine_options, write_frames):
+    global _worker_processor
+    # Each worker gets one core; letting OpenCV spawn its own threads on top oversubscribes the node
+    cv2.setNumThreads(1)
+    _worker_processor = BatchProcessor(build_engine(**engine_options), write_frames=write_frames)
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def _process_chunk(video_path, start_frame, end_frame, warmup_frames):
+    summary = _worker_processor.process_video(video_path, start_frame, end_frame, warmup_frames)
+    summary['worker_pid'] = os.getpid()
+    summary['worker_peak_rss_mb'] = _peak_rss_mb()
+    return summary
+
+def plan_chunks(video_paths, chunk_seconds=300, max_frames=None, warmup_seconds=0):
+    # Long videos are split into fixed-length frame ranges; OpenCV seeks to the preceding
+    # keyframe and decodes forward, so every chunk starts on the exact frame requested
+    chunks = []
+    for video_path in video_paths:
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            print(f"Could not open video: {video_path}")
+            continue
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        cap.release()
+        if max_frames is not None:
+            frame_count = min(frame_count, max_frames) if frame_count > 0 else max_frames
+        chunk_frames = max(int(chunk_seconds * fps), 1)
+        if frame_count <= 0 or not chunk_seconds:
+            # Unknown length: the whole video is one chunk
+            chunks.append((video_path, 0, max_frames, 0))
+            continue
+        warmup_frames = int(warmup_seconds * fps)
+        for start_frame in range(0, frame_count, chunk_frames):
+            chunks.append((video_path, start_frame, min(start_frame + chunk_frames, frame_count),
+                           warmup_frames if start_frame else 0))
+    return chunks
+
+def merge_chunks(summaries, failed_chunks=()):
+    # Chunks of one video, merged back in frame order; failed_chunks are the (start, end) frame ranges
+    # whose worker failed, which leave the merged video incomplete
+    summaries = sorted(summaries, key=lambda summary: summary['start_frame'])
+    engagement_data = new_engagement_data()
+    rows = []
+    for summary in summaries:
+        for zone, count in summary['engagement_data'].items():
+            engagement_data[zone] = engagement_data.get(zone, 0) + count
+        rows.extend(summary['rows'])
+    frames = sum(summary['frames'] for summary in summaries)
+    elapsed = sum(summary['elapsed_seconds'] for summary in summaries)
+    warmup = sum(summary['warmup_seconds'] for summary in summaries)
+    fps = summaries[0]['video_fps']
+    return {
+        'video': summaries[0]['video'],
+        'start_frame': summaries[0]['start_frame'],
+        'frames': frames,
+        'video_fps': fps,
+        'video_seconds': frames / fps,
+        'elapsed_seconds': elapsed,
+        'warmup_seconds': warmup,
+        'processing_fps': frames / elapsed if elapsed > 0 else 0.0,
+        'engagement_data': engagement_data,
+        'rows': rows,
+        'chunks': len(summaries),
+        'failed_chunks': [list(chunk) for chunk in sorted(failed_chunks)],
+        'incomplete': bool(failed_chunks),
+    }
+
+class BatchPool:
+    # Fans chunks out over worker processes. dlib and most of the per-frame OpenCV work hold the GIL,
+    # so throughput only scales with processes. The memory budget caps the number of workers, and the
+    # number of chunks in flight is bounded so finished per-frame rows never pile up in the parent.
+    def __init__(self, engine_options=None, output_dir='src/data/batch', write_frames=True, charts=False,
+                 workers=None, memory_budget_mb=None, worker_memory_mb=600, chunk_seconds=300, warmup_seconds=2):
+        self.engine_options = engine_options or {}
+        self.write_frames = write_frames
+        self.writer = BatchProcessor(None, output_dir=output_dir, write_frames=write_frames, charts=charts)
+        self.worker_memory_mb = worker_memory_mb
+        self.chunk_seconds = chunk_seconds
+        self.warmup_seconds = warmup_seconds
+        workers = workers or os.cpu_count() or 1
+        if memory_budget_mb is not None:
+            workers = min(workers, max(int(memory_budget_mb // worker_memory_mb), 1))
+        self.workers = workers
+        self.max_in_flight = workers * 2
+
+    def run(self, video_paths, max_frames=None):
+        chunks = plan_chunks(video_paths, self.chunk_seconds, max_frames, self.warmup_seconds)
+        remaining = {}
+        for video_path, _, _, _ in chunks:
+            remaining[video_path] = remaining.get(video_path, 0) + 1
+        print(f"Processing {len(remaining)} videos as {len(chunks)} chunks on {self.workers} worker processes")
+
+        results = {video_path: [] for video_path in remaining}
+        failed = {video_path: [] for video_path in remaining}
+        summaries = []
+        peak_rss = {}
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                 initargs=(self.engine_options, self.write_frames)) as executor:
+            pending = {}
+            next_chunk = 0
+            while next_chunk < len(chunks) or pending:
+                while next_chunk < len(chunks) and len(pending) < self.max_in_flight:
+                    chunk = chunks[next_chunk]
+                    next_chunk += 1
+                    try:
+                        future = executor.submit(_process_chunk, *chunk)
+                    except Exception as e:
+                        # A broken pool refuses new work; the chunk counts as failed like one that crashed
+                        summaries.extend(self._chunk_done(chunk, None, e, remaining, results, failed))
+                        continue
+                    pending[future] = chunk
+                if not pending:
+                    continue
+
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    chunk = pending.pop(future)
+                    try:
+                        summary = future.result()
+                    except Exception as e:
+                        # Includes BrokenProcessPool; videos that already finished keep their outputs
+                        summaries.extend(self._chunk_done(chunk, None, e, remaining, results, failed))
+                        continue
+                    if summary['worker_peak_rss_mb'] is not None:
+                        peak_rss[summary['worker_pid']] = summary['worker_peak_rss_mb']
+                    summaries.extend(self._chunk_done(chunk, summary, None, remaining, results, failed))
+
+        elapsed = time.perf_counter() - start
+        total_frames = sum(summary['frames'] for summary in summaries)
+        fps = total_frames / elapsed if elapsed > 0 else 0.0
+        print(f"Processed {len(summaries)} videos, {total_frames} frames in {elapsed:.2f} s: {fps:.1f} fps")
+        if peak_rss:
+            largest = max(peak_rss.values())
+            print(f"Peak worker memory: {largest:.0f} MB (budgeted {self.worker_memory_mb} MB per worker)")
+            if largest > self.worker_memory_mb:
+                print("Workers exceeded their memory estimate; raise worker_memory_mb to keep within the budget.")
+        return summaries
+
+    def _chunk_done(self, chunk, summary, error, remaining, results, failed):
+        # A video is written once all of its chunks are back, whether they succeeded or failed
+        video_path, start_frame, end_frame, _ = chunk
+        if error is not None:
+            print(f"{video_path}: frames {start_frame}-{end_frame} failed: {error!r}")
+            failed[video_path].append((start_frame, end_frame))
+        else:
+            results[video_path].append(summary)
+        remaining[video_path] -= 1
+        if remaining[video_path]:
+            return []
+        return self._finish_video(video_path, results.pop(video_path), failed.pop(video_path))
+
+    def _finish_video(self, video_path, chunk_summaries, failed_chunks=()):
+        if not chunk_summaries:
+            print(f"{video_path}: no chunk finished, nothing written")
+            return []
+        summary = merge_chunks(chunk_summaries, failed_chunks)
+        report = self.writer.write_outputs(summary)
+        score = f", engagement score {report['engagement_score']:.2f}%" if report else ""
+        missing = f", incomplete ({len(failed_chunks)} chunks failed)" if failed_chunks else ""
+        print(f"{summary['video']}: {summary['frames']} frames in {summary['chunks']} chunks{score}{missing}")
+        summary.pop('rows')
+        return [summary]
@@ -0,0 +1,190 @@
+import csv
+import hashlib
+import json
+import os
+import time
+import cv2
+import numpy as np
+from core.face_detector import FaceDetector
+from core.eye_tracker import EyeTracker
+from core.identity_verifier import IdentityVerifier
+from core.monitoring_engine import MonitoringEngine
+from core.drowsiness import DrowsinessMonitor
+from core.car_calibration import load_calibration_data
+from utils.engagement_rate import GazeZoneClassifier, new_engagement_data, count_engagement
+from utils.metrics_report import generate_metrics_report, write_report_data
+
+VIDEO_EXTENSIONS = ('.mp4', '.avi', '.mov', '.mkv', '.m4v')
+
+FRAME_FIELDS = ['frame_id', 'timestamp', 'face_x', 'face_y', 'face_w', 'face_h', 'recognized',
+                'eyes_valid', 'gaze_zone', 'ear', 'eyes_missing_seconds', 'alert_level', 'perclos', 'blink_rate',
+                'drowsiness_event']
+
+def result_row(result):
+    face = result.face if result.face is not None else (None, None, None, None)
+    return [result.frame_id, round(result.timestamp, 4), *[None if v is None else int(v) for v in face],
+            int(bool(result.recognized)), int(result.eyes_valid), result.gaze_zone,
+            None if result.ear is None else round(result.ear, 4),
+            round(result.eyes_missing_seconds, 4), result.alert_level,
+            None if result.perclos is None else round(result.perclos, 4),
+            None if result.blink_rate is None else round(result.blink_rate, 2), result.drowsiness_event]
+
+def find_videos(paths):
+    videos = []
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        else:
+            videos.append(path)
+    return videos
+
+class AnyFaceVerifier:
+    # Stand-in for IdentityVerifier when recorded drivers have no stored descriptor:
+    # every detected face is treated as the driver.
+    def reset(self):
+        self.frames = 0
+
+    def face_lost(self):
+        pass
+
+    def verify(self, frame, face, user_face_descriptor, context=None):
+        self.frames += 1
+        return face is not None
+
+    def get_stats(self):
+        return {'frames': self.frames, 'verifications': 0}
+
+def build_engine(backend='haar', pyramid_downscale=2, verify_identity=True,
+                 user_calibration_path='src/data/user_calibration.npz', calibration_points=None):
+    # No camera, window or alert sound: only the perception stages of DriverMonitoringSystem
+    face_detector = FaceDetector(backend=backend, pyramid_downscale=pyramid_downscale)
+    eye_tracker = EyeTracker()
+    user_face_descriptor = None
+    if verify_identity:
+        if not os.path.exists(user_calibration_path):
+            raise FileNotFoundError(f"User calibration data not found: {user_calibration_path}")
+        user_face_descriptor = np.load(user_calibration_path)['face_descriptor']
+        identity_verifier = IdentityVerifier(face_detector)
+    else:
+        identity_verifier = AnyFaceVerifier()
+        identity_verifier.reset()
+
+    if calibration_points is None:
+        calibration_points = load_calibration_data()
+    if calibration_points is None:
+        print("Calibration data not found, gaze zones will be reported as 'other'.")
+    zone_classifier = GazeZoneClassifier(calibration_points) if calibration_points is not None else None
+    return MonitoringEngine(face_detector, eye_tracker, identity_verifier, zone_classifier=zone_classifier,
+                            user_face_descriptor=user_face_descriptor, drowsiness=DrowsinessMonitor())
+
+class BatchProcessor:
+    # Runs recorded videos through a MonitoringEngine as fast as frames can be decoded.
+    # Timers run on video time (frame index / fps), so results do not depend on processing speed.
+    def __init__(self, engine, output_dir='src/data/batch', write_frames=True, charts=False):
+        self.engine = engine
+        self.output_dir = output_dir
+        self.write_frames = write_frames
+        self.charts = charts
+
+    def process_video(self, video_path, start_frame=0, end_frame=None, warmup_frames=0):
+        # warmup_frames before start_frame are processed but not counted, so a chunk starts
+        # with face tracking and the eyes-missing timer in the state the previous chunk left them
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise IOError(f"Could not open video: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        first_frame = max(start_frame - warmup_frames, 0)
+        if first_frame:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, first_frame)
+
+        self.engine.reset()
+        self.engine.frame_id = first_frame
+        engagement_data = new_engagement_data()
+        rows = []
+        frame_index = first_frame
+        # Warmup frames are timed apart from the counted ones, so processing_fps only covers the frames it counts
+        start = time.perf_counter()
+        counted_start = start if first_frame == start_frame else None
+        while end_frame is None or frame_index < end_frame:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            result = self.engine.process(frame, timestamp=frame_index / fps)
+            frame_index += 1
+            if result.frame_id < start_frame:
+                if frame_index == start_frame:
+                    counted_start = time.perf_counter()
+                continue
+            count_engagement(engagement_data, result)
+            if self.write_frames:
+                rows.append(result_row(result))
+        end = time.perf_counter()
+        cap.release()
+
+        if counted_start is None:
+            counted_start = end
+        elapsed = end - counted_start
+        frames = max(frame_index - start_frame, 0)
+        return {
+            'video': video_path,
+            'start_frame': start_frame,
+            'frames': frames,
+            'video_fps': fps,
+            'video_seconds': frames / fps,
+            'elapsed_seconds': elapsed,
+            'warmup_seconds': counted_start - start,
+            'processing_fps': frames / elapsed if elapsed > 0 else 0.0,
+            'engagement_data': engagement_data,
+            'rows': rows,
+        }
+
+    def write_outputs(self, summary):
+        # Videos from different folders can share a file name, so the folder name carries a hash of the full path
+        name = os.path.splitext(os.path.basename(summary['video']))[0]
+        path_hash = hashlib.sha1(os.path.abspath(summary['video']).encode()).hexdigest()[:8]
+        video_dir = os.path.join(self.output_dir, f'{name}_{path_hash}')
+        os.makedirs(video_dir, exist_ok=True)
+
+        if self.write_frames:
+            with open(os.path.join(video_dir, 'frames.csv'), 'w', newline='') as frames_file:
+                writer = csv.writer(frames_file)
+                writer.writerow(FRAME_FIELDS)
+                writer.writerows(summary['rows'])
+
+        report = None
+        if summary['frames']:
+            report = generate_metrics_report(summary['engagement_data'], summary['video_seconds'], summary['frames'],
+                                             report_file_path=os.path.join(video_dir, 'report_data.json'),
+                                             chart_dir=video_dir, make_charts=self.charts, verbose=False)
+            if summary.get('incomplete'):
+                # Some frame ranges were never processed (failed batch chunks), so the report does not cover the whole video
+                report.update(incomplete=True, failed_chunks=summary['failed_chunks'])
+                write_report_data(report, os.path.join(video_dir, 'report_data.json'))
+        stats = {key: value for key, value in summary.items() if key != 'rows'}
+        with open(os.path.join(video_dir, 'batch_stats.json'), 'w') as stats_file:
+            json.dump(stats, stats_file, indent=2)
+        return report
+
+    def run(self, video_paths, max_frames=None):
+        summaries = []
+        total_frames = 0
+        start = time.perf_counter()
+        for video_path in video_paths:
+            try:
+                summary = self.process_video(video_path, end_frame=max_frames)
+            except IOError as e:
+                print(e)
+                continue
+            report = self.write_outputs(summary)
+            total_frames += summary['frames']
+            score = f", engagement score {report['engagement_score']:.2f}%" if report else ""
+            print(f"{video_path}: {summary['frames']} frames in {summary['elapsed_seconds']:.2f} s "
+                  f"({summary['processing_fps']:.1f} fps){score}")
+            summary.pop('rows')
+            summaries.append(summary)
+        elapsed = time.perf_counter() - start
+        fps = total_frames / elapsed if elapsed > 0 else 0.0
+        print(f"Processed {len(summaries)} videos, {total_frames} frames in {elapsed:.2f} s: {fps:.1f} fps")
+        return summaries
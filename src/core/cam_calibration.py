@@ -1,25 +1,20 @@
 import cv2
-import dlib
 import time
+from core.pyramid import detect_faces
+from core.landmarks import shape_to_np
+from core.model_registry import get_face_recognition_model, get_frontal_face_detector, get_shape_predictor
 import numpy as np
 import os
 
-# Initialize the camera
-cap = cv2.VideoCapture(0)
-
-# Load Dlib's face detector and shape predictor
-detector = dlib.get_frontal_face_detector()
-predictor = dlib.shape_predictor("src/models/shape_predictor_68_face_landmarks_GTX.dat")
-face_recognition_model = dlib.face_recognition_model_v1("src/models/dlib_face_recognition_resnet_model_v1.dat")
-
 # Define the desired range for the important features (e.g., eyes, nose, mouth)
 min_eye_distance = 40
 max_eye_distance = 100
 min_face_size = 100
 max_face_size = 300
+detection_downscale = 1  # dlib HOG needs ~80 px faces in the image it sees; raise to 2 on 1080p cameras
 
 def get_face_landmarks(gray, detector, predictor):
-    faces = detector(gray)
+    faces = detect_faces(detector, gray, detection_downscale)
     for face in faces:
         landmarks = predictor(gray, face)
         return landmarks, face
@@ -27,11 +22,10 @@ def get_face_landmarks(gray, detector, predictor):
 
 def check_position(landmarks):
     if landmarks:
-        left_eye = landmarks.part(36)
-        right_eye = landmarks.part(45)
-        eye_distance = ((left_eye.x - right_eye.x) ** 2 + (left_eye.y - right_eye.y) ** 2) ** 0.5
+        points = shape_to_np(landmarks)
+        eye_distance = np.linalg.norm(points[36] - points[45])
 
-        face_width = landmarks.part(16).x - landmarks.part(0).x
+        face_width = points[16, 0] - points[0, 0]
 
         if min_eye_distance < eye_distance < max_eye_distance and min_face_size < face_width < max_face_size:
             return "Good"
@@ -51,56 +45,78 @@ def draw_x(frame, center, size, color):
     cv2.line(frame, x3, x4, color, thickness=5)
 
 def save_user_face_descriptor(frame, face):
-    shape = predictor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), face)
-    face_descriptor = np.array(face_recognition_model.compute_face_descriptor(frame, shape))
+    shape = get_shape_predictor()(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), face)
+    face_descriptor = np.array(get_face_recognition_model().compute_face_descriptor(frame, shape))
     save_path = 'src/data/user_calibration.npz'
     os.makedirs(os.path.dirname(save_path), exist_ok=True)
     np.savez(save_path, face_descriptor=face_descriptor)
 
+class PositionCalibration:
+    # Owns the camera only between start() and stop(), so importing this module has no side effects
+    def __init__(self, camera_index=0, duration=5, save_face_descriptor=True):
+        self.camera_index = camera_index
+        self.duration = duration  # seconds
+        self.save_face_descriptor = save_face_descriptor
+        self.cap = None
+
+    def start(self):
+        if self.cap is None:
+            self.cap = cv2.VideoCapture(self.camera_index)
+
+    def stop(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        cv2.destroyAllWindows()
+
+    def run(self):
+        self.start()
+        try:
+            return self._calibrate()
+        finally:
+            self.stop()
+
+    def _calibrate(self):
+        start_time = None
+        center = (50, 50)
+        radius = 20
+        while True:
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            landmarks, face = get_face_landmarks(gray, get_frontal_face_detector(), get_shape_predictor())
+            position = check_position(landmarks)
+
+            if position == "Good":
+                if start_time is None:
+                    start_time = time.time()
+                elapsed_time = time.time() - start_time
+                progress = min(elapsed_time / self.duration, 1.0)
+                draw_loading_circle(frame, center, radius, progress, (0, 255, 0))
+                cv2.putText(frame, "Good Position", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                cv2.rectangle(frame, (0, 0), (frame.shape[1], frame.shape[0]), (0, 255, 0), 5)
+                if elapsed_time >= self.duration:
+                    if self.save_face_descriptor:
+                        save_user_face_descriptor(frame, face)
+                    return True
+            else:
+                start_time = None
+                draw_x(frame, center, radius, (0, 0, 255))
+                cv2.putText(frame, "Bad Position", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
+                cv2.rectangle(frame, (0, 0), (frame.shape[1], frame.shape[0]), (0, 0, 255), 5)
+
+            if landmarks:
+                for x, y in shape_to_np(landmarks).tolist():
+                    cv2.circle(frame, (x, y), 1, (255, 255, 255), -1)
+
+            cv2.imshow("Calibration", frame)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+
+        return False
+
 def perform_calibration():
-    start_time = None
-    duration = 5  # seconds
-    center = (50, 50)
-    radius = 20
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        landmarks, face = get_face_landmarks(gray, detector, predictor)
-        position = check_position(landmarks)
-
-        if position == "Good":
-            if start_time is None:
-                start_time = time.time()
-            elapsed_time = time.time() - start_time
-            progress = min(elapsed_time / duration, 1.0)
-            draw_loading_circle(frame, center, radius, progress, (0, 255, 0))
-            cv2.putText(frame, "Good Position", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.rectangle(frame, (0, 0), (frame.shape[1], frame.shape[0]), (0, 255, 0), 5)
-            if elapsed_time >= duration:
-                save_user_face_descriptor(frame, face)
-                cap.release()
-                cv2.destroyAllWindows()
-                return True
-        else:
-            start_time = None
-            draw_x(frame, center, radius, (0, 0, 255))
-            cv2.putText(frame, "Bad Position", (10, 90), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 2)
-            cv2.rectangle(frame, (0, 0), (frame.shape[1], frame.shape[0]), (0, 0, 255), 5)
-
-        if landmarks:
-            for n in range(0, 68):
-                x = landmarks.part(n).x
-                y = landmarks.part(n).y
-                cv2.circle(frame, (x, y), 1, (255, 255, 255), -1)
-
-        cv2.imshow("Calibration", frame)
-
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
-    return False
+    return PositionCalibration().run()
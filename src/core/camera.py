@@ -1,17 +1,171 @@
+import threading
+import time
+from collections import deque
 import cv2
+import numpy as np
 
 class Camera:
-    def __init__(self):
-        self.cap = cv2.VideoCapture(0)
+    def __init__(self, source=0, threaded=False, buffer_size=4, stats_window=300, headless=False):
+        # The device is only acquired by open() (or the first get_frame), not on construction
+        self.source = source
+        self.headless = headless
+        self.cap = None
+        self.frame_width = None
+        self.frame_height = None
+
+        self.threaded = threaded
+        self.buffer_size = max(3, buffer_size)
+        self.stats_window = stats_window
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+        self._reset_state()
+
+    def _reset_state(self):
+        self.frames_captured = 0
+        self.frames_consumed = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+        self.last_frame_timestamp = None
+        self.pickup_latencies = deque(maxlen=self.stats_window)
+        self.process_latencies = deque(maxlen=self.stats_window)
+
+        self._ring = None
+        self._ring_timestamps = np.zeros(self.buffer_size, dtype=np.float64)
+        self._latest_slot = -1
+        self._latest_seq = 0
+        self._consumed_seq = 0
+        self._held_slot = -1
+
+    def is_open(self):
+        return self.cap is not None
+
+    def open(self):
+        if self.cap is not None:
+            return
+        self._reset_state()
+        self.cap = cv2.VideoCapture(self.source)
         self.frame_width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         self.frame_height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-        cv2.namedWindow("Driver Monitoring System")
+        if not self.headless:
+            cv2.namedWindow("Driver Monitoring System")
+        if self.threaded:
+            self.start_capture()
+
+    def start_capture(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._capture_loop, name="CameraCapture", daemon=True)
+        self._thread.start()
+
+    def stop_capture(self):
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def _allocate_ring(self, shape, dtype):
+        self._ring = np.empty((self.buffer_size,) + shape, dtype=dtype)
+        self._latest_slot = -1
+        self._held_slot = -1
+
+    def _next_slot(self):
+        # Never write into the newest frame or the one the consumer is still working on
+        slot = (self._latest_slot + 1) % self.buffer_size
+        while slot == self._held_slot or slot == self._latest_slot:
+            slot = (slot + 1) % self.buffer_size
+        return slot
+
+    def _capture_loop(self):
+        while self._running:
+            if self._ring is None:
+                ret, frame = self.cap.read()
+                if not ret:
+                    self.read_failures += 1
+                    time.sleep(0.005)
+                    continue
+                with self._condition:
+                    self._allocate_ring(frame.shape, frame.dtype)
+                    slot = self._next_slot()
+                    self._ring[slot] = frame
+                    self._publish(slot)
+                continue
+
+            with self._condition:
+                slot = self._next_slot()
+            # The slot is neither published nor held, so it can be filled without the lock
+            ret, frame = self.cap.read(self._ring[slot])
+            if not ret:
+                self.read_failures += 1
+                time.sleep(0.005)
+                continue
+            with self._condition:
+                if frame.shape != self._ring.shape[1:]:
+                    self._allocate_ring(frame.shape, frame.dtype)
+                    slot = self._next_slot()
+                    self._ring[slot] = frame
+                elif frame.ctypes.data != self._ring[slot].ctypes.data:
+                    self._ring[slot] = frame
+                self._publish(slot)
+
+    def _publish(self, slot):
+        self._ring_timestamps[slot] = time.monotonic()
+        if self._latest_seq > self._consumed_seq:
+            # The previous frame was never picked up by the consumer
+            self.frames_dropped += 1
+        self._latest_slot = slot
+        self._latest_seq += 1
+        self.frames_captured += 1
+        self._condition.notify_all()
+
+    def get_frame(self, timeout=0.5):
+        if self.cap is None:
+            self.open()
+        if not self.threaded:
+            ret, frame = self.cap.read()
+            if not ret:
+                return None
+            self.last_frame_timestamp = time.monotonic()
+            self.frames_captured += 1
+            self.frames_consumed += 1
+            return frame
+
+        with self._condition:
+            if self._latest_seq == self._consumed_seq:
+                self._condition.wait_for(lambda: self._latest_seq > self._consumed_seq or not self._running, timeout)
+            if self._latest_seq == self._consumed_seq:
+                return None
+            slot = self._latest_slot
+            self._held_slot = slot
+            self._consumed_seq = self._latest_seq
+            self.last_frame_timestamp = self._ring_timestamps[slot]
+            self.frames_consumed += 1
+            self.pickup_latencies.append(time.monotonic() - self.last_frame_timestamp)
+            return self._ring[slot]
+
+    def frame_processed(self):
+        if self.last_frame_timestamp is not None:
+            self.process_latencies.append(time.monotonic() - self.last_frame_timestamp)
+
+    def get_stats(self):
+        def summarize(samples):
+            if not samples:
+                return {'mean_ms': 0.0, 'max_ms': 0.0}
+            values = np.fromiter(samples, dtype=np.float64) * 1000
+            return {'mean_ms': float(values.mean()), 'max_ms': float(values.max())}
 
-    def get_frame(self):
-        ret, frame = self.cap.read()
-        if not ret:
-            return None
-        return frame
+        return {
+            'threaded': self.threaded,
+            'frames_captured': self.frames_captured,
+            'frames_consumed': self.frames_consumed,
+            'frames_dropped': self.frames_dropped,
+            'read_failures': self.read_failures,
+            'pickup_latency': summarize(self.pickup_latencies),
+            'capture_to_process_latency': summarize(self.process_latencies),
+        }
 
     def display_frame(self, frame):
         cv2.imshow("Driver Monitoring System", frame)
@@ -26,5 +180,9 @@ class Camera:
         return cv2.waitKey(1) & 0xFF == ord('q')
 
     def release(self):
-        self.cap.release()
-        cv2.destroyAllWindows()
+        self.stop_capture()
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+        if not self.headless:
+            cv2.destroyAllWindows()
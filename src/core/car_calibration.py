@@ -1,6 +1,7 @@
 import os
 import numpy as np
 import cv2
+from core.frame_context import FrameContext
 
 calibration_file = 'src/data/calibration_data.npz'
 
@@ -49,9 +50,10 @@ def calibrate(camera, face_detector, eye_tracker):
                     if frame is None:
                         continue
 
-                    face = face_detector.detect_face(frame)
+                    context = FrameContext(frame)
+                    face = face_detector.detect_face(frame, context)
                     if face is not None:
-                        eye_positions = eye_tracker.track_eyes(frame, face)
+                        eye_positions = eye_tracker.track_eyes(frame, face, context)
                         display_instruction(frame, sub_instruction)
 
                         if cv2.waitKey(1) & 0xFF == ord('c'):
@@ -66,9 +68,10 @@ def calibrate(camera, face_detector, eye_tracker):
                 if frame is None:
                     continue
 
-                face = face_detector.detect_face(frame)
+                context = FrameContext(frame)
+                face = face_detector.detect_face(frame, context)
                 if face is not None:
-                    eye_positions = eye_tracker.track_eyes(frame, face)
+                    eye_positions = eye_tracker.track_eyes(frame, face, context)
                     display_instruction(frame, instruction)
 
                     if cv2.waitKey(1) & 0xFF == ord('c'):
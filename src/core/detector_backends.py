@@ -0,0 +1,186 @@
+import os
+import time
+from abc import ABC, abstractmethod
+import cv2
+import dlib
+import numpy as np
+from core.model_registry import get_frontal_face_detector
+
+models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+data_dir = os.path.join(os.path.dirname(__file__), '..', 'data')
+sample_clip_path = os.path.join(data_dir, 'detector_sample.mp4')
+
+class FaceDetectorBackend(ABC):
+    # Common interface: detect() takes a gray image and returns (x, y, w, h) boxes in native
+    # frame coordinates, whatever scale the backend worked at internally.
+    name = None
+
+    def __init__(self, downscale=1.0, upsample=0):
+        self.downscale = max(float(downscale), 1.0)
+        self.upsample = int(upsample)
+
+    def detect(self, gray, frame=None, min_size=None, max_size=None, pyramid_factor=1):
+        # pyramid_factor says how much gray was already downscaled from the native frame;
+        # min_size, max_size and the returned boxes are always in native pixels.
+        scale = (2 ** self.upsample) / self.downscale
+        image = gray if scale == 1.0 else cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR)
+        native_to_image = scale / pyramid_factor
+        scaled_min = None if min_size is None else max(int(min_size * native_to_image), 1)
+        scaled_max = None if max_size is None else max(int(max_size * native_to_image), 1)
+        boxes = self._detect(image, frame, native_to_image, scaled_min, scaled_max)
+        if len(boxes) == 0:
+            return []
+        boxes = np.asarray(boxes, dtype=np.float64)
+        if native_to_image != 1.0:
+            boxes = boxes / native_to_image
+        return [box for box in np.round(boxes).astype(np.int32)]
+
+    @abstractmethod
+    def _detect(self, image, frame, scale, min_size, max_size):
+        # Boxes found in image (already scaled by scale from native pixels), in image coordinates
+        pass
+
+    @staticmethod
+    def _filter_sizes(boxes, min_size, max_size):
+        return [box for box in boxes
+                if (min_size is None or min(box[2], box[3]) >= min_size)
+                and (max_size is None or max(box[2], box[3]) <= max_size)]
+
+class HaarBackend(FaceDetectorBackend):
+    name = 'haar'
+
+    def __init__(self, downscale=1.0, upsample=0, scale_factor=1.1, min_neighbors=5, min_size=50):
+        super().__init__(downscale, upsample)
+        haarcascade_path = os.path.join(data_dir, 'haarcascade_frontalface_default.xml')
+        self.face_cascade = cv2.CascadeClassifier(haarcascade_path)
+        if self.face_cascade.empty():
+            raise FileNotFoundError(f"Haar cascade not found: {haarcascade_path}")
+        self.scale_factor = scale_factor
+        self.min_neighbors = min_neighbors
+        self.min_size = min_size
+
+    def _detect(self, image, frame, scale, min_size, max_size):
+        min_side = max(min_size or 0, max(int(self.min_size * scale), 1))
+        max_side = max_size or 0
+        return self.face_cascade.detectMultiScale(image, scaleFactor=self.scale_factor, minNeighbors=self.min_neighbors,
+                                                  minSize=(min_side, min_side), maxSize=(max_side, max_side),
+                                                  flags=cv2.CASCADE_SCALE_IMAGE)
+
+class DlibHogBackend(FaceDetectorBackend):
+    name = 'dlib_hog'
+
+    def __init__(self, downscale=1.0, upsample=0):
+        super().__init__(downscale, 0)
+        # dlib upsamples internally, so the count is passed to the detector rather than applied by resize
+        self.detector_upsample = int(upsample)
+        self.detector = get_frontal_face_detector()
+
+    def _detect(self, image, frame, scale, min_size, max_size):
+        rects = self.detector(image, self.detector_upsample)
+        boxes = [(r.left(), r.top(), r.width(), r.height()) for r in rects]
+        return self._filter_sizes(boxes, min_size, max_size)
+
+class OpenCVDnnBackend(FaceDetectorBackend):
+    name = 'opencv_dnn'
+
+    def __init__(self, downscale=1.0, upsample=0, confidence_threshold=0.5, input_size=300):
+        super().__init__(downscale, upsample)
+        prototxt_path = os.path.join(models_dir, 'deploy.prototxt')
+        model_path = os.path.join(models_dir, 'res10_300x300_ssd_iter_140000.caffemodel')
+        for path in (prototxt_path, model_path):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"OpenCV DNN face model not found: {path}")
+        self.net = cv2.dnn.readNetFromCaffe(prototxt_path, model_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        self.confidence_threshold = confidence_threshold
+        self.input_size = input_size
+
+    def _detect(self, image, frame, scale, min_size, max_size):
+        # The SSD resizes to its own input size, so the colour frame is used as-is when available
+        bgr = frame if frame is not None else cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        height, width = image.shape[:2]
+        blob = cv2.dnn.blobFromImage(bgr, 1.0, (self.input_size, self.input_size), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+        detections = detections[detections[:, 2] >= self.confidence_threshold]
+        boxes = []
+        for x0, y0, x1, y1 in detections[:, 3:7] * np.array([width, height, width, height]):
+            x0, y0 = max(int(x0), 0), max(int(y0), 0)
+            x1, y1 = min(int(x1), width), min(int(y1), height)
+            if x1 > x0 and y1 > y0:
+                boxes.append((x0, y0, x1 - x0, y1 - y0))
+        return self._filter_sizes(boxes, min_size, max_size)
+
+BACKENDS = {
+    HaarBackend.name: HaarBackend,
+    DlibHogBackend.name: DlibHogBackend,
+    OpenCVDnnBackend.name: OpenCVDnnBackend,
+}
+
+def register_backend(backend_class):
+    BACKENDS[backend_class.name] = backend_class
+    return backend_class
+
+def create_backend(name, **options):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown face detector backend '{name}'. Available: {', '.join(BACKENDS)}")
+    return BACKENDS[name](**options)
+
+def load_sample_frames(path=sample_clip_path, max_frames=60):
+    frames = []
+    cap = cv2.VideoCapture(path)
+    while len(frames) < max_frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames.append(frame)
+    cap.release()
+    return frames
+
+def benchmark_backends(frames, names=None, options=None, labels=None):
+    # Without labels, a frame counts as containing a face if any backend found one in it
+    names = names or list(BACKENDS)
+    options = options or {}
+    grays = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) for frame in frames]
+    detections = {}
+    results = {}
+    for name in names:
+        try:
+            backend = create_backend(name, **options.get(name, {}))
+        except Exception as e:
+            print(f"Skipping face detector backend '{name}': {e}")
+            continue
+        found = []
+        start = time.perf_counter()
+        for frame, gray in zip(frames, grays):
+            found.append(len(backend.detect(gray, frame)) > 0)
+        elapsed = time.perf_counter() - start
+        detections[name] = np.array(found, dtype=bool)
+        results[name] = {'ms_per_frame': elapsed * 1000 / max(len(frames), 1)}
+
+    if labels is None:
+        labels = np.any(list(detections.values()), axis=0) if detections else np.zeros(len(frames), dtype=bool)
+    labels = np.asarray(labels, dtype=bool)
+    positives = max(int(labels.sum()), 1)
+    for name, found in detections.items():
+        results[name]['recall'] = float((found & labels).sum()) / positives
+    return results
+
+def select_fastest_backend(frames=None, recall_floor=0.9, names=None, options=None, labels=None, default='haar'):
+    if frames is None:
+        frames = load_sample_frames()
+    if not frames:
+        print(f"No detector sample clip at {sample_clip_path}, using the '{default}' face detector backend.")
+        return default
+
+    results = benchmark_backends(frames, names, options, labels)
+    eligible = [name for name, result in results.items() if result['recall'] >= recall_floor]
+    for name, result in sorted(results.items(), key=lambda item: item[1]['ms_per_frame']):
+        print(f"Face detector backend {name}: {result['ms_per_frame']:.2f} ms/frame, recall {result['recall']:.2f}")
+    if not eligible:
+        print(f"No face detector backend reached recall {recall_floor:.2f}, using '{default}'.")
+        return default
+    selected = min(eligible, key=lambda name: results[name]['ms_per_frame'])
+    print(f"Selected face detector backend: {selected}")
+    return selected
@@ -0,0 +1,154 @@
+from collections import deque
+import numpy as np
+
+class DrowsinessMonitor:
+    # Rolling PERCLOS, blink rate and microsleep detection from per-frame EAR, O(1) amortised per frame.
+    # The window holds the frames of the last window_seconds by timestamp (not by frame count, so skipped
+    # or dropped frames do not stretch it), with running sums; frames without a valid EAR are kept but
+    # count neither as open nor as closed. An eye closure shorter than microsleep_seconds (and at least
+    # min_blink_seconds) is a blink, anything longer a microsleep.
+    def __init__(self, window_seconds=60, closed_threshold=0.21, min_blink_seconds=0.05,
+                 microsleep_seconds=0.5, max_blinks=512):
+        self.window_seconds = window_seconds
+        self.closed_threshold = closed_threshold
+        self.min_blink_seconds = min_blink_seconds
+        self.microsleep_seconds = microsleep_seconds
+        self.max_blinks = max_blinks
+        self.reset()
+
+    def reset(self):
+        # (timestamp, closed, valid, ear) per frame, oldest first
+        self.window = deque()
+        self.closed_sum = 0
+        self.valid_sum = 0
+        # Blink timestamps, oldest at blink_head; entries older than the window are skipped lazily
+        self.blink_times = np.zeros(self.max_blinks, dtype=np.float64)
+        self.blink_head = 0
+        self.blink_count = 0
+        self.closure_start = None
+        self.microsleep_active = False
+        self.blinks = 0
+        self.microsleeps = []
+
+    def update(self, ear, timestamp):
+        # Returns 'blink', 'microsleep_start', 'microsleep_end' or None
+        event = None
+        if ear is None or not np.isfinite(ear):
+            self.window.append((timestamp, 0, 0, np.nan))
+        else:
+            is_closed = int(ear < self.closed_threshold)
+            self.window.append((timestamp, is_closed, 1, float(ear)))
+            self.closed_sum += is_closed
+            self.valid_sum += 1
+            event = self._track_closure(is_closed, timestamp)
+        self._expire_frames(timestamp)
+        self._expire_blinks(timestamp)
+        return event
+
+    def _expire_frames(self, timestamp):
+        cutoff = timestamp - self.window_seconds
+        while self.window and self.window[0][0] < cutoff:
+            _, closed, valid, _ = self.window.popleft()
+            self.closed_sum -= closed
+            self.valid_sum -= valid
+
+    def _track_closure(self, is_closed, timestamp):
+        if is_closed:
+            if self.closure_start is None:
+                self.closure_start = timestamp
+            elif not self.microsleep_active and timestamp - self.closure_start >= self.microsleep_seconds:
+                # Reported while the eyes are still shut, so an alert does not wait for them to open
+                self.microsleep_active = True
+                return 'microsleep_start'
+            return None
+
+        if self.closure_start is None:
+            return None
+        duration = timestamp - self.closure_start
+        self.closure_start = None
+        if self.microsleep_active or duration >= self.microsleep_seconds:
+            self.microsleep_active = False
+            self.microsleeps.append((timestamp - duration, duration))
+            return 'microsleep_end'
+        if duration >= self.min_blink_seconds:
+            self._add_blink(timestamp)
+            return 'blink'
+        return None
+
+    def _add_blink(self, timestamp):
+        if self.blink_count == self.max_blinks:
+            self.blink_head = (self.blink_head + 1) % self.max_blinks
+            self.blink_count -= 1
+        self.blink_times[(self.blink_head + self.blink_count) % self.max_blinks] = timestamp
+        self.blink_count += 1
+        self.blinks += 1
+
+    def _expire_blinks(self, timestamp):
+        cutoff = timestamp - self.window_seconds
+        while self.blink_count and self.blink_times[self.blink_head] < cutoff:
+            self.blink_head = (self.blink_head + 1) % self.max_blinks
+            self.blink_count -= 1
+
+    def window_ear(self):
+        # EAR over the window, oldest first (NaN where there were no eyes)
+        return np.fromiter((ear for _, _, _, ear in self.window), dtype=np.float32, count=len(self.window))
+
+    def perclos(self):
+        return self.closed_sum / self.valid_sum if self.valid_sum else 0.0
+
+    def blink_rate(self):
+        # Blinks per minute over the window
+        return self.blink_count * 60.0 / self.window_seconds
+
+    def eyes_closed(self):
+        return self.closure_start is not None
+
+    def get_stats(self):
+        return {
+            'perclos': self.perclos(),
+            'blink_rate_per_min': self.blink_rate(),
+            'blinks': self.blinks,
+            'microsleeps': len(self.microsleeps),
+            'longest_microsleep_s': float(max((duration for _, duration in self.microsleeps), default=0.0)),
+        }
+
+def analyze_ear_series(ear, timestamps, window_seconds=60, closed_threshold=0.21, min_blink_seconds=0.05,
+                       microsleep_seconds=0.5):
+    # Whole-series version for stored sessions (e.g. the 'ear' and 'ts' columns of a session export).
+    # NaN marks frames without eyes. Matches DrowsinessMonitor frame for frame, but with array operations.
+    ear = np.asarray(ear, dtype=np.float64)
+    timestamps = np.asarray(timestamps, dtype=np.float64)
+    valid = np.isfinite(ear)
+    closed = valid & (np.nan_to_num(ear, nan=np.inf) < closed_threshold)
+
+    closed_cumsum = np.concatenate(([0], np.cumsum(closed)))
+    valid_cumsum = np.concatenate(([0], np.cumsum(valid)))
+    ends = np.arange(1, len(ear) + 1)
+    # Same window as the live monitor: frames no older than window_seconds before the current one
+    starts = np.searchsorted(timestamps, timestamps - window_seconds, side='left')
+    closed_window = closed_cumsum[ends] - closed_cumsum[starts]
+    valid_window = valid_cumsum[ends] - valid_cumsum[starts]
+    perclos = np.divide(closed_window, valid_window, out=np.zeros(len(ear)), where=valid_window > 0)
+
+    # Closure runs over valid frames only; frames without eyes neither start nor end a closure
+    valid_closed = closed[valid].astype(np.int8)
+    valid_times = timestamps[valid]
+    edges = np.diff(np.concatenate(([0], valid_closed, [0])))
+    run_starts = np.flatnonzero(edges == 1)
+    run_ends = np.flatnonzero(edges == -1)
+    # A closure only ends on an open frame; one still open at the end of the series is left out
+    finished = run_ends < len(valid_times)
+    run_starts, run_ends = run_starts[finished], run_ends[finished]
+    durations = valid_times[run_ends] - valid_times[run_starts]
+
+    is_microsleep = durations >= microsleep_seconds
+    is_blink = ~is_microsleep & (durations >= min_blink_seconds)
+    blink_times = valid_times[run_ends][is_blink]
+    blinks_in_window = np.searchsorted(blink_times, timestamps, side='right') - \
+        np.searchsorted(blink_times, timestamps - window_seconds, side='left')
+    return {
+        'perclos': perclos,
+        'blink_rate_per_min': blinks_in_window * 60.0 / window_seconds,
+        'blink_times': blink_times,
+        'microsleeps': list(zip(valid_times[run_starts][is_microsleep], durations[is_microsleep])),
+    }
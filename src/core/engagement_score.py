@@ -48,3 +48,8 @@ def classify_gaze_duration(duration, threshold):
         return 0  # Neutral
     else:
         return -1  # Negative
+
+def evaluate_closed_eyes(closure_durations):
+    # Scores each eye closure long enough to count as a microsleep against ENGAGEMENT_CRITERIA['closed_eyes']
+    criteria = ENGAGEMENT_CRITERIA['closed_eyes']
+    return sum(classify_gaze_duration(duration, criteria['threshold']) for duration in closure_durations)
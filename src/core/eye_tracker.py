@@ -1,30 +1,29 @@
-import dlib
-import os
 import cv2
 import numpy as np
+from core.frame_context import FrameContext
+from core.landmarks import LEFT_EYE, RIGHT_EYE
+from core.model_registry import get_frontal_face_detector, get_shape_predictor
 
 class EyeTracker:
     def __init__(self):
-        predictor_path = os.path.join(os.path.dirname(__file__), '../models/shape_predictor_68_face_landmarks_GTX.dat')
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor(predictor_path)
+        self.detector = get_frontal_face_detector()
+        self.predictor = get_shape_predictor()
 
-    def track_eyes(self, frame, face):
-        x, y, w, h = face
-        dlib_rect = dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
-        landmarks = self.predictor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), dlib_rect)
-        left_eye = self.extract_eye_region(landmarks, range(36, 42))
-        right_eye = self.extract_eye_region(landmarks, range(42, 48))
-        self.draw_eye_contours(frame, left_eye)
-        self.draw_eye_contours(frame, right_eye)
-        self.draw_iris_cross(frame, left_eye)
-        self.draw_iris_cross(frame, right_eye)
+    def track_eyes(self, frame, face, context=None, draw=True):
+        if context is None:
+            context = FrameContext(frame)
+        landmarks = context.get_landmarks(self.predictor, face)
+        left_eye = self.extract_eye_region(landmarks, LEFT_EYE)
+        right_eye = self.extract_eye_region(landmarks, RIGHT_EYE)
+        if draw:
+            self.draw_eye_contours(frame, left_eye)
+            self.draw_eye_contours(frame, right_eye)
+            self.draw_iris_cross(frame, left_eye)
+            self.draw_iris_cross(frame, right_eye)
         return left_eye, right_eye
 
     def extract_eye_region(self, landmarks, points):
-        eye_region = [(landmarks.part(n).x, landmarks.part(n).y) for n in points]
-        eye_region = np.array(eye_region)
-        return eye_region
+        return landmarks[points]
 
     def draw_eye_contours(self, frame, eye_region):
         cv2.polylines(frame, [eye_region], True, (0, 255, 0), 2)
@@ -47,7 +46,4 @@ class EyeTracker:
     def is_eye_detected(self, eye_region):
         if eye_region is None or len(eye_region) == 0:
             return False
-        for point in eye_region:
-            if point[0] <= 0 or point[1] <= 0:
-                return False
-        return True
+        return bool(np.all(np.asarray(eye_region) > 0))
@@ -1,14 +1,19 @@
+import time
 import cv2
-import dlib
 import numpy as np
-from scipy.spatial import distance as dist
+from core.pyramid import detect_faces
+from core.landmarks import shape_to_np, eye_aspect_ratio
+from core.drowsiness import DrowsinessMonitor
+from core.model_registry import get_frontal_face_detector, get_shape_predictor
 
 class EyeTracking:
-    def __init__(self):
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor("src/models/shape_predictor_68_face_landmarks_GTX.dat")
+    def __init__(self, detection_downscale=1):
+        self.detector = get_frontal_face_detector()
+        self.predictor = get_shape_predictor()
         self.camera = None
         self.max_score = 100  # Example value, adjust based on your criteria
+        self.detection_downscale = detection_downscale
+        self.drowsiness = DrowsinessMonitor()
 
     def start(self, camera_index):
         self.camera = cv2.VideoCapture(camera_index)
@@ -26,18 +31,20 @@ class EyeTracking:
 
     def get_gaze_data(self, frame):
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        rects = self.detector(gray, 0)
+        rects = detect_faces(self.detector, gray, self.detection_downscale)
         gaze_data = []
 
-        for rect in rects:
+        for i, rect in enumerate(rects):
             shape = self.predictor(gray, rect)
-            shape = np.array([[p.x, p.y] for p in shape.parts()])
+            shape = shape_to_np(shape)
 
             left_eye = shape[42:48]
             right_eye = shape[36:42]
 
             left_ear = self.eye_aspect_ratio(left_eye)
             right_ear = self.eye_aspect_ratio(right_eye)
+            if i == 0:
+                self.drowsiness.update((left_ear + right_ear) / 2, time.time())
 
             left_gaze_ratio = self.get_gaze_ratio(left_eye, gray)
             right_gaze_ratio = self.get_gaze_ratio(right_eye, gray)
@@ -50,11 +57,7 @@ class EyeTracking:
         return gaze_data
 
     def eye_aspect_ratio(self, eye):
-        A = dist.euclidean(eye[1], eye[5])
-        B = dist.euclidean(eye[2], eye[4])
-        C = dist.euclidean(eye[0], eye[3])
-        ear = (A + B) / (2.0 * C)
-        return ear
+        return float(eye_aspect_ratio(eye))
 
     def get_gaze_ratio(self, eye, gray):
         mask = np.zeros_like(gray)
@@ -1,19 +1,72 @@
 import cv2
 import os
-import dlib
 import numpy as np
+from core.frame_context import FrameContext
+from core.model_registry import get_face_recognition_model, get_shape_predictor
+from core.pyramid import downscale_gray
+from core.detector_backends import BACKENDS, create_backend, select_fastest_backend
 
 class FaceDetector:
-    def __init__(self):
-        haarcascade_path = os.path.join(os.path.dirname(__file__), '../data/haarcascade_frontalface_default.xml')
-        self.face_cascade = cv2.CascadeClassifier(haarcascade_path)
-        self.face_recognition_model = dlib.face_recognition_model_v1('src/models/dlib_face_recognition_resnet_model_v1.dat')
-        self.shape_predictor = dlib.shape_predictor('src/models/shape_predictor_68_face_landmarks_GTX.dat')
+    def __init__(self, backend='haar', backend_options=None, pyramid_downscale=1, track_faces=True, redetect_interval=15, roi_margin=0.5):
+        # backend_options are the named backend's constructor kwargs; with backend='auto' they are
+        # keyed by backend name instead ({'opencv_dnn': {...}, 'haar': {...}}), since each takes different ones
+        backend_options = backend_options or {}
+        if backend == 'auto':
+            backend = select_fastest_backend(options=backend_options)
+            backend_options = backend_options.get(backend, {})
+        self.backend_name = backend
+        self.backend = create_backend(backend, **backend_options)
+        self.face_recognition_model = get_face_recognition_model()
+        self.shape_predictor = get_shape_predictor()
         self.known_face_descriptor = None
 
-    def detect_face(self, frame):
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(50, 50), flags=cv2.CASCADE_SCALE_IMAGE)
+        # Pyramid mode: detection runs on a gray image downscaled by this factor (2 or 4) and the
+        # boxes are mapped back to native resolution for the shape predictor and iris localisation.
+        self.pyramid_downscale = pyramid_downscale
+
+        # Detect-then-track: a full-frame search runs every redetect_interval frames or when the
+        # face is lost, otherwise only a window around the previous box is searched.
+        self.track_faces = track_faces
+        self.redetect_interval = redetect_interval
+        self.roi_margin = roi_margin
+        self.last_face = None
+        self.frames_since_detection = 0
+        self.detection_stats = {'full': 0, 'roi_hits': 0, 'roi_misses': 0}
+
+    def reset_tracking(self):
+        self.last_face = None
+        self.frames_since_detection = 0
+
+    def detect_face(self, frame, context=None):
+        # The governor retunes pyramid_downscale and redetect_interval from another thread, so both
+        # are read once per frame and the same factor is used for the image and for mapping boxes back
+        factor = self.pyramid_downscale
+        redetect_interval = self.redetect_interval
+        if context is not None:
+            detection_gray = context.get_downscaled_gray(factor)
+        else:
+            detection_gray = downscale_gray(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), factor)
+
+        face = None
+        if self.track_faces and self.last_face is not None and self.frames_since_detection < redetect_interval:
+            face = self.detect_face_in_roi(detection_gray, self.last_face, frame, factor)
+            if face is not None:
+                self.detection_stats['roi_hits'] += 1
+                self.frames_since_detection += 1
+            else:
+                self.detection_stats['roi_misses'] += 1
+
+        if face is None:
+            face = self.detect_face_full(detection_gray, frame, factor)
+            self.detection_stats['full'] += 1
+            self.frames_since_detection = 0
+
+        self.last_face = face
+        return face
+
+    def detect_face_full(self, gray, frame=None, factor=None):
+        factor = self.pyramid_downscale if factor is None else factor
+        faces = self.backend.detect(gray, frame, pyramid_factor=factor)
         
         if len(faces) == 0:
             return None
@@ -22,16 +75,43 @@ class FaceDetector:
         face = max(faces, key=lambda rect: rect[2] * rect[3])
         return face  # Return the largest detected face
 
+    def detect_face_in_roi(self, gray, previous_face, frame=None, factor=None):
+        # gray may be a pyramid level; the window is computed in native pixels and mapped onto it
+        factor = self.pyramid_downscale if factor is None else factor
+        x, y, w, h = previous_face
+        margin_x = int(w * self.roi_margin)
+        margin_y = int(h * self.roi_margin)
+        x0 = max(int(x) - margin_x, 0) // factor
+        y0 = max(int(y) - margin_y, 0) // factor
+        x1 = min((int(x + w) + margin_x) // factor, gray.shape[1])
+        y1 = min((int(y + h) + margin_y) // factor, gray.shape[0])
+        roi = gray[y0:y1, x0:x1]
+        if roi.size == 0:
+            return None
+        frame_roi = frame[y0 * factor:y1 * factor, x0 * factor:x1 * factor] if frame is not None else None
+
+        # The head barely moves between frames, so the scale search is limited around the previous size
+        min_side = max(int(min(w, h) * 0.7), 50)
+        max_side = int(max(w, h) * 1.4)
+        faces = self.backend.detect(roi, frame_roi, min_size=min_side, max_size=max_side, pyramid_factor=factor)
+        if len(faces) == 0:
+            return None
+
+        fx, fy, fw, fh = max(faces, key=lambda rect: rect[2] * rect[3])
+        return np.array([fx + x0 * factor, fy + y0 * factor, fw, fh])
+
     def draw_detected_face(self, frame, face):
         if face is not None:
             x, y, w, h = face
             cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
 
-    def get_face_descriptor(self, frame, face):
-        x, y, w, h = face
-        rect = dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
-        shape = self.shape_predictor(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY), rect)
-        return np.array(self.face_recognition_model.compute_face_descriptor(frame, shape))
+    def get_face_descriptor(self, frame, face, context=None):
+        if context is None:
+            context = FrameContext(frame)
+        shape = context.get_shape(self.shape_predictor, face)
+        if context.descriptor is None:
+            context.descriptor = np.array(self.face_recognition_model.compute_face_descriptor(frame, shape))
+        return context.descriptor
 
     def save_user_face(self, frame, face):
         self.known_face_descriptor = self.get_face_descriptor(frame, face)
@@ -39,10 +119,10 @@ class FaceDetector:
         os.makedirs(os.path.dirname(save_path), exist_ok=True)
         np.savez(save_path, face_descriptor=self.known_face_descriptor)
 
-    def recognize_user_face(self, frame, face, user_face_descriptor):
+    def recognize_user_face(self, frame, face, user_face_descriptor, context=None):
         if user_face_descriptor is None:
             return False
         
-        face_descriptor = self.get_face_descriptor(frame, face)
+        face_descriptor = self.get_face_descriptor(frame, face, context)
         distance = np.linalg.norm(face_descriptor - user_face_descriptor)
         return distance < 0.6  # Adjust the threshold as necessary
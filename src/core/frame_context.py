@@ -0,0 +1,57 @@
+import cv2
+import dlib
+from core.pyramid import downscale_gray
+from core.landmarks import shape_to_np
+
+class FrameContext:
+    # Per-frame perception results shared by FaceDetector, EyeTracker and recognition,
+    # so the gray conversion, landmarking and descriptor each run at most once per frame.
+    def __init__(self, frame, frame_id=None):
+        self.frame = frame
+        self.frame_id = frame_id
+        self._gray = None
+        self._pyramid = {}
+        self.face = None
+        self.rect = None
+        self.shape = None
+        self.landmarks = None
+        self.descriptor = None
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def get_downscaled_gray(self, factor):
+        if factor <= 1:
+            return self.gray
+        if factor not in self._pyramid:
+            self._pyramid[factor] = downscale_gray(self.gray, factor)
+        return self._pyramid[factor]
+
+    def set_face(self, face):
+        if face is not None and self.face is not None and tuple(face) == tuple(self.face):
+            return
+        self.face = face
+        self.rect = None
+        self.shape = None
+        self.landmarks = None
+        self.descriptor = None
+        if face is not None:
+            x, y, w, h = face
+            self.rect = dlib.rectangle(int(x), int(y), int(x + w), int(y + h))
+
+    def get_shape(self, predictor, face=None):
+        if face is not None:
+            self.set_face(face)
+        if self.shape is None:
+            self.shape = predictor(self.gray, self.rect)
+        return self.shape
+
+    def get_landmarks(self, predictor, face=None):
+        if face is not None:
+            self.set_face(face)
+        if self.landmarks is None:
+            self.landmarks = shape_to_np(self.get_shape(predictor))
+        return self.landmarks
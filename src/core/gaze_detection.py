@@ -1,55 +1,33 @@
 import cv2
-import dlib
 import numpy as np
+from core.pyramid import detect_faces
+from core.iris import IrisLocator
+from core.landmarks import shape_to_np
+from core.model_registry import get_frontal_face_detector, get_shape_predictor
 
 class IrisTracker:
-    def __init__(self):
-        predictor_path = "src/Models/shape_predictor_68_face_landmarks_GTX.dat"
-        self.detector = dlib.get_frontal_face_detector()
-        self.predictor = dlib.shape_predictor(predictor_path)
+    def __init__(self, detection_downscale=1, debug_iris=False):
+        self.detector = get_frontal_face_detector()
+        self.predictor = get_shape_predictor()
         self.cap = None
         self.tracking = False
+        self.headless = False
+        self.last_gaze_direction = None
+        self.detection_downscale = detection_downscale
+        self.iris_locator = IrisLocator(debug=debug_iris)
 
     def midpoint(self, point1, point2):
         return (int((point1[0] + point2[0]) / 2), int((point1[1] + point2[1]) / 2))
 
     def get_eye_region(self, landmarks, eye_points):
-        return [(landmarks.part(point).x, landmarks.part(point).y) for point in eye_points]
+        return shape_to_np(landmarks)[eye_points]
 
     def get_iris_position(self, eye_region, frame, gray):
-        mask = np.zeros((frame.shape[0], frame.shape[1]), dtype=np.uint8)
-        cv2.fillPoly(mask, [np.array(eye_region, dtype=np.int32)], 255)
-        eye = cv2.bitwise_and(gray, gray, mask=mask)
-        
-        min_x = np.min(np.array(eye_region)[:, 0])
-        max_x = np.max(np.array(eye_region)[:, 0])
-        min_y = np.min(np.array(eye_region)[:, 1])
-        max_y = np.max(np.array(eye_region)[:, 1])
-        eye = eye[min_y:max_y, min_x:max_x]
-        
-        eye = cv2.equalizeHist(eye)
-        threshold = cv2.adaptiveThreshold(eye, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
-        
-        mask_eye = mask[min_y:max_y, min_x:max_x]
-        eye_masked = cv2.bitwise_and(threshold, threshold, mask=mask_eye)
-        
-        contours, _ = cv2.findContours(eye_masked, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-        contours = sorted(contours, key=lambda x: cv2.contourArea(x), reverse=True)
-        
-        scale_factor = 10
-        threshold_resized = cv2.resize(eye_masked, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_LINEAR)
-        cv2.imshow("Threshold", threshold_resized)
-
-        if contours:
-            cnt = contours[0]
-            (x, y, w, h) = cv2.boundingRect(cnt)
-            iris_position = (x + int(w / 2), y + int(h / 2))
-            return (iris_position[0] + min_x, iris_position[1] + min_y)
-        return None
+        return self.iris_locator.locate(eye_region, gray)
 
-    def process_frame(self, frame):
+    def process_frame(self, frame, draw=True):
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        faces = self.detector(gray)
+        faces = detect_faces(self.detector, gray, self.detection_downscale)
         
         for face in faces:
             landmarks = self.predictor(gray, face)
@@ -64,8 +42,9 @@ class IrisTracker:
                 avg_iris_position_x = (left_iris_position[0] + right_iris_position[0]) / 2
                 avg_iris_position_y = (left_iris_position[1] + right_iris_position[1]) / 2
                 
-                cv2.circle(frame, left_iris_position, 2, (0, 255, 0), -1)
-                cv2.circle(frame, right_iris_position, 2, (0, 255, 0), -1)
+                if draw:
+                    cv2.circle(frame, left_iris_position, 2, (0, 255, 0), -1)
+                    cv2.circle(frame, right_iris_position, 2, (0, 255, 0), -1)
                 
                 left_eye_center = self.midpoint(left_eye_region[0], left_eye_region[3])
                 right_eye_center = self.midpoint(right_eye_region[0], right_eye_region[3])
@@ -87,17 +66,21 @@ class IrisTracker:
                     gaze_direction_y = "Straight"
 
                 gaze_direction = f"{gaze_direction_x}, {gaze_direction_y}"
-                cv2.putText(frame, f"Gaze: {gaze_direction}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
+                self.last_gaze_direction = gaze_direction
+                if draw:
+                    cv2.putText(frame, f"Gaze: {gaze_direction}", (10, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 0, 0), 2)
         
         return frame
 
-    def start_tracking(self, camera_index):
+    def start_tracking(self, camera_index, headless=False):
         self.cap = cv2.VideoCapture(camera_index)
         self.tracking = True
+        self.headless = headless
 
-        # Create a named window and set its size
-        cv2.namedWindow("Frame", cv2.WINDOW_NORMAL)
-        cv2.resizeWindow("Frame", 640, 480)  # Set window size to 640x480
+        if not headless:
+            # Create a named window and set its size
+            cv2.namedWindow("Frame", cv2.WINDOW_NORMAL)
+            cv2.resizeWindow("Frame", 640, 480)  # Set window size to 640x480
 
         try:
             while self.tracking:
@@ -106,7 +89,9 @@ class IrisTracker:
                     print("Failed to grab frame")
                     break
                 
-                frame = self.process_frame(frame)
+                frame = self.process_frame(frame, draw=not headless)
+                if headless:
+                    continue
                 cv2.imshow("Frame", frame)
                 key = cv2.waitKey(1)
                 if key == 27:
@@ -121,4 +106,5 @@ class IrisTracker:
         self.tracking = False
         if self.cap is not None:
             self.cap.release()
-        cv2.destroyAllWindows()
+        if not self.headless:
+            cv2.destroyAllWindows()
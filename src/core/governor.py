@@ -0,0 +1,140 @@
+import json
+import math
+import os
+import time
+
+# Quality levels from best to cheapest. Each step trades accuracy for time: fewer full-frame face
+# searches, a coarser detection pyramid, less frequent identity re-verification and, last, skipping frames.
+GOVERNOR_LEVELS = [
+    {'pyramid_downscale': 1, 'redetect_interval': 10, 'reverify_interval': 30, 'frame_stride': 1},
+    {'pyramid_downscale': 2, 'redetect_interval': 15, 'reverify_interval': 30, 'frame_stride': 1},
+    {'pyramid_downscale': 2, 'redetect_interval': 30, 'reverify_interval': 60, 'frame_stride': 1},
+    {'pyramid_downscale': 4, 'redetect_interval': 30, 'reverify_interval': 90, 'frame_stride': 1},
+    {'pyramid_downscale': 4, 'redetect_interval': 45, 'reverify_interval': 120, 'frame_stride': 2},
+    {'pyramid_downscale': 4, 'redetect_interval': 60, 'reverify_interval': 150, 'frame_stride': 3},
+]
+
+class FrameRateGovernor:
+    # Keeps the per-frame cost inside budget_ms. The cost is the sum of the engine stage times
+    # (or, when pipelined, the slowest stage, since stages overlap). Every check_every frames the
+    # smoothed cost is compared with the budget: over budget drops one level straight away,
+    # and a level is only regained after recover_checks checks in a row below headroom * budget.
+    def __init__(self, face_detector, identity_verifier, pipeline=None, budget_ms=33.0, levels=None, start_level=1,
+                 check_every=30, headroom=0.6, recover_checks=3, smoothing=0.1, base_tick_ms=1000 // 30):
+        self.face_detector = face_detector
+        self.identity_verifier = identity_verifier
+        self.pipeline = pipeline
+        self.budget_ms = budget_ms
+        self.levels = levels or GOVERNOR_LEVELS
+        self.start_level = start_level
+        self.check_every = check_every
+        self.headroom = headroom
+        self.recover_checks = recover_checks
+        self.smoothing = smoothing
+        self.base_tick_ms = base_tick_ms
+        self.reset()
+
+    def reset(self):
+        self.level = None
+        self.cost_ms = None
+        self.stage_ms = {}
+        self.tick_ms = None
+        self.tick_interval_ms = self.base_tick_ms
+        self.frames = 0
+        self.under_budget_checks = 0
+        self.window_start = None
+        self.window_frames = 0
+        self.effective_fps = 0.0
+        self.decisions = []
+        self.set_level(self.start_level, reason='start')
+
+    def set_level(self, level, reason, timestamp=None):
+        level = min(max(level, 0), len(self.levels) - 1)
+        if level == self.level:
+            return
+        knobs = self.levels[level]
+        self.face_detector.pyramid_downscale = knobs['pyramid_downscale']
+        self.face_detector.redetect_interval = knobs['redetect_interval']
+        if hasattr(self.identity_verifier, 'reverify_interval'):
+            self.identity_verifier.reverify_interval = knobs['reverify_interval']
+        if self.pipeline is not None:
+            self.pipeline.frame_stride = knobs['frame_stride']
+
+        decision = {
+            'timestamp': time.time() if timestamp is None else timestamp,
+            'frame': self.frames,
+            'from_level': self.level,
+            'to_level': level,
+            'reason': reason,
+            'cost_ms': self.cost_ms,
+            'budget_ms': self.budget_ms,
+            'stage_ms': dict(self.stage_ms),
+            'effective_fps': self.effective_fps,
+            'knobs': dict(knobs),
+        }
+        self.decisions.append(decision)
+        self.level = level
+        cost = f"{self.cost_ms:.1f} ms" if self.cost_ms is not None else "n/a"
+        print(f"Governor: level {decision['from_level']} -> {level} ({reason}), cost {cost}, "
+              f"budget {self.budget_ms:.1f} ms, {self.effective_fps:.1f} fps, knobs {knobs}")
+
+    def frame_stride(self):
+        return self.levels[self.level]['frame_stride']
+
+    def observe(self, result):
+        stage_seconds = result.stage_seconds
+        if not stage_seconds:
+            return
+        cost = (max(stage_seconds.values()) if self.pipeline is not None else sum(stage_seconds.values())) * 1000
+        alpha = self.smoothing
+        self.cost_ms = cost if self.cost_ms is None else self.cost_ms + alpha * (cost - self.cost_ms)
+        for name, seconds in stage_seconds.items():
+            previous = self.stage_ms.get(name)
+            self.stage_ms[name] = seconds * 1000 if previous is None else previous + alpha * (seconds * 1000 - previous)
+
+        self.frames += 1
+        if self.window_start is None:
+            self.window_start = result.timestamp
+        self.window_frames += 1
+        if self.window_frames >= self.check_every:
+            elapsed = result.timestamp - self.window_start
+            self.effective_fps = (self.window_frames - 1) / elapsed if elapsed > 0 else 0.0
+            self.window_start = result.timestamp
+            self.window_frames = 1
+            self._check(result.timestamp)
+
+    def observe_tick(self, seconds):
+        # Time the GUI timer callback itself took; the timer is never asked to fire faster than that
+        tick_ms = seconds * 1000
+        self.tick_ms = tick_ms if self.tick_ms is None else self.tick_ms + self.smoothing * (tick_ms - self.tick_ms)
+        self.tick_interval_ms = max(self.base_tick_ms, int(math.ceil(self.tick_ms * 1.25)))
+
+    def _check(self, timestamp):
+        if self.cost_ms > self.budget_ms:
+            self.under_budget_checks = 0
+            if self.level < len(self.levels) - 1:
+                self.set_level(self.level + 1, 'over budget', timestamp)
+        elif self.cost_ms < self.budget_ms * self.headroom:
+            self.under_budget_checks += 1
+            if self.under_budget_checks >= self.recover_checks and self.level > 0:
+                self.under_budget_checks = 0
+                self.set_level(self.level - 1, 'headroom', timestamp)
+        else:
+            self.under_budget_checks = 0
+
+    def get_stats(self):
+        return {
+            'level': self.level,
+            'budget_ms': self.budget_ms,
+            'cost_ms': self.cost_ms,
+            'stage_ms': dict(self.stage_ms),
+            'effective_fps': self.effective_fps,
+            'tick_interval_ms': self.tick_interval_ms,
+            'frames': self.frames,
+            'decisions': len(self.decisions),
+        }
+
+    def save_log(self, path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w') as log_file:
+            json.dump({'stats': self.get_stats(), 'decisions': self.decisions}, log_file, indent=2)
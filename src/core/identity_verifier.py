@@ -0,0 +1,85 @@
+import time
+
+def box_iou(box_a, box_b):
+    ax, ay, aw, ah = box_a
+    bx, by, bw, bh = box_b
+    inter_w = min(ax + aw, bx + bw) - max(ax, bx)
+    inter_h = min(ay + ah, by + bh) - max(ay, by)
+    if inter_w <= 0 or inter_h <= 0:
+        return 0.0
+    intersection = inter_w * inter_h
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union > 0 else 0.0
+
+class IdentityVerifier:
+    # Runs the ResNet face descriptor only when the identity actually needs confirming:
+    # on the first frame, every reverify_interval frames, when the face box jumps, or after the face was lost.
+    def __init__(self, face_detector, reverify_interval=30, iou_threshold=0.5):
+        self.face_detector = face_detector
+        self.reverify_interval = reverify_interval
+        self.iou_threshold = iou_threshold
+        self.reset()
+
+    def reset(self):
+        self.verified = False
+        self.last_box = None
+        self.frames_since_verification = 0
+        self.cache_hits = 0
+        self.verifications = 0
+        self.verification_time = 0.0
+        self.reverify_reasons = {'initial': 0, 'interval': 0, 'box_jump': 0, 'face_lost': 0, 'rejected': 0}
+        self._face_lost = False
+
+    def face_lost(self):
+        if self.verified:
+            self._face_lost = True
+        self.verified = False
+        self.last_box = None
+
+    def _reverify_reason(self, face):
+        if not self.verified:
+            if self._face_lost:
+                return 'face_lost'
+            return 'rejected' if self.verifications else 'initial'
+        if self.frames_since_verification >= self.reverify_interval:
+            return 'interval'
+        if box_iou(face, self.last_box) < self.iou_threshold:
+            return 'box_jump'
+        return None
+
+    def verify(self, frame, face, user_face_descriptor, context=None):
+        if face is None:
+            self.face_lost()
+            return False
+
+        reason = self._reverify_reason(face)
+        if reason is None:
+            self.cache_hits += 1
+            self.frames_since_verification += 1
+            self.last_box = face
+            return True
+
+        start = time.perf_counter()
+        recognized = self.face_detector.recognize_user_face(frame, face, user_face_descriptor, context)
+        self.verification_time += time.perf_counter() - start
+        self.verifications += 1
+        self.reverify_reasons[reason] += 1
+
+        self.verified = recognized
+        self.last_box = face if recognized else None
+        self.frames_since_verification = 0
+        self._face_lost = False
+        return recognized
+
+    def get_stats(self):
+        total = self.cache_hits + self.verifications
+        average_verification = self.verification_time / self.verifications if self.verifications else 0.0
+        return {
+            'frames': total,
+            'verifications': self.verifications,
+            'cache_hits': self.cache_hits,
+            'hit_rate': self.cache_hits / total if total else 0.0,
+            'average_verification_ms': average_verification * 1000,
+            'time_saved_s': self.cache_hits * average_verification,
+            'reverify_reasons': dict(self.reverify_reasons),
+        }
@@ -0,0 +1,60 @@
+import cv2
+import numpy as np
+
+class IrisLocator:
+    # ROI-first iris localisation: every step works on the eye's bounding box only,
+    # in scratch buffers that are reused across frames and grown when an eye gets bigger.
+    def __init__(self, debug=False, debug_window="Threshold", debug_scale=10):
+        self.debug = debug
+        self.debug_window = debug_window
+        self.debug_scale = debug_scale
+        self._buffers = {}
+
+    def _scratch(self, name, height, width):
+        size = height * width
+        buffer = self._buffers.get(name)
+        if buffer is None or buffer.size < size:
+            buffer = np.empty(size, dtype=np.uint8)
+            self._buffers[name] = buffer
+        return buffer[:size].reshape(height, width)
+
+    def locate(self, eye_region, gray):
+        points = np.asarray(eye_region, dtype=np.int32).reshape(-1, 2)
+        min_x, min_y = points.min(axis=0)
+        max_x, max_y = points.max(axis=0)
+        min_x, min_y = max(min_x, 0), max(min_y, 0)
+        max_x, max_y = min(max_x, gray.shape[1]), min(max_y, gray.shape[0])
+        height, width = max_y - min_y, max_x - min_x
+        if height <= 0 or width <= 0:
+            return None
+
+        # The polygon is rasterised one pixel wider than the crop so its right and bottom
+        # edges are not clipped, matching a full-frame mask cropped to the bounding box
+        polygon_mask = self._scratch('mask', height + 1, width + 1)
+        polygon_mask.fill(0)
+        cv2.fillPoly(polygon_mask, [points - (min_x, min_y)], 255)
+        mask = polygon_mask[:height, :width]
+
+        eye = self._scratch('eye', height, width)
+        eye.fill(0)
+        cv2.copyTo(gray[min_y:max_y, min_x:max_x], mask, eye)
+        cv2.equalizeHist(eye, dst=eye)
+
+        threshold = self._scratch('threshold', height, width)
+        cv2.adaptiveThreshold(eye, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2, dst=threshold)
+        eye_masked = self._scratch('eye_masked', height, width)
+        eye_masked.fill(0)
+        cv2.copyTo(threshold, mask, eye_masked)
+
+        if self.debug:
+            threshold_resized = cv2.resize(eye_masked, None, fx=self.debug_scale, fy=self.debug_scale, interpolation=cv2.INTER_LINEAR)
+            cv2.imshow(self.debug_window, threshold_resized)
+
+        contours, _ = cv2.findContours(eye_masked, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
+        if not contours:
+            return None
+
+        cnt = max(contours, key=cv2.contourArea)
+        (x, y, w, h) = cv2.boundingRect(cnt)
+        iris_position = (x + int(w / 2), y + int(h / 2))
+        return (int(iris_position[0] + min_x), int(iris_position[1] + min_y))
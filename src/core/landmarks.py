@@ -0,0 +1,38 @@
+import numpy as np
+
+LEFT_EYE = slice(36, 42)
+RIGHT_EYE = slice(42, 48)
+
+_last_conversion = (None, None)
+
+def shape_to_np(shape, dtype=np.int32):
+    # One pass over shape.parts() instead of a .part(n).x/.y round-trip per coordinate.
+    # The last conversion is cached, so several consumers of the same shape share one array.
+    global _last_conversion
+    last_shape, last_points = _last_conversion
+    if shape is last_shape and last_points.dtype == dtype:
+        return last_points
+    parts = shape.parts()
+    points = np.fromiter((c for p in parts for c in (p.x, p.y)), dtype=dtype, count=2 * len(parts)).reshape(-1, 2)
+    points.flags.writeable = False
+    _last_conversion = (shape, points)
+    return points
+
+def eye_regions(points):
+    return points[LEFT_EYE], points[RIGHT_EYE]
+
+def eye_center(eye):
+    return (int((eye[0][0] + eye[3][0]) / 2), int((eye[0][1] + eye[3][1]) / 2))
+
+def eye_aspect_ratio(eye):
+    # Works on one (6, 2) eye or a stacked (..., 6, 2) batch of eyes
+    eye = np.asarray(eye, dtype=np.float64)
+    vertical = np.linalg.norm(eye[..., [1, 2], :] - eye[..., [5, 4], :], axis=-1).sum(axis=-1)
+    horizontal = np.linalg.norm(eye[..., 0, :] - eye[..., 3, :], axis=-1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ear = vertical / (2.0 * horizontal)
+    return np.where(horizontal > 0, ear, 0.0)
+
+def mean_eye_aspect_ratio(left_eye, right_eye):
+    # Both eyes in one vectorised call
+    return float(eye_aspect_ratio(np.stack((left_eye, right_eye))).mean())
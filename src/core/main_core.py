@@ -3,33 +3,59 @@
 from core.camera import Camera
 from core.face_detector import FaceDetector
 from core.eye_tracker import EyeTracker
-from utils.engagement_rate import calculate_engagement_rate
-from core.car_calibration import get_calibration_data
-from utils.metrics_report import generate_metrics_report
+from core.identity_verifier import IdentityVerifier
+from core.alert_service import AlertService
+from core.monitoring_engine import MonitoringEngine
+from core.overlay import OverlayRenderer
+from core.pipeline import MonitoringPipeline
+from core.governor import FrameRateGovernor
+from core.metrics_server import serve_metrics
+from core.drowsiness import DrowsinessMonitor
+from core.engagement_score import evaluate_closed_eyes
+from core.model_registry import mark_startup, print_startup_report
+from core import tracing
+from utils.engagement_rate import GazeZoneClassifier, new_engagement_data, count_engagement
+from core.car_calibration import get_calibration_data, load_calibration_data
+from utils.metrics_report import write_report_data, print_metrics_report, render_charts_async
+from utils.metrics_accumulator import MetricsAccumulator
+from utils.gaze_writer import GazeEventWriter
+from utils.session_store import SessionStore
+from utils.session_export import SessionExporter
 import time
 import os
 import cv2
-from playsound import playsound
 import numpy as np
 
 class DriverMonitoringSystem:
-    def __init__(self):
-        self.camera = Camera()
-        self.face_detector = FaceDetector()
+    def __init__(self, headless=False, pipelined=True, username=None, latency_budget_ms=33.0, trace=False,
+                 metrics_port=None, detector_backend='haar', detector_options=None):
+        mark_startup('monitoring_system_init')
+        if trace:
+            # Frames over the latency budget dump the recent spans to src/data/traces
+            tracing.enable(budget_ms=latency_budget_ms)
+        self.headless = headless
+        self.username = username
+        self.camera = Camera(threaded=True, headless=headless)
+        # 'haar', 'dlib_hog', 'opencv_dnn', or 'auto' to benchmark them on src/data/detector_sample.mp4; no clip
+        # ships with the tree yet, so the default is Haar rather than probing and falling back on every start
+        self.face_detector = FaceDetector(backend=detector_backend, backend_options=detector_options, pyramid_downscale=2)
         self.eye_tracker = EyeTracker()
+        self.identity_verifier = IdentityVerifier(self.face_detector)
         self.calibration_points = None
+        self.zone_classifier = None
         self.alert_sound_path = os.path.join(os.path.dirname(__file__), '..', 'utils', 'alert_sound.wav')
-        self.engagement_data = {
-            'rearview_mirror': 0,
-            'left_side_mirror': 0,
-            'right_side_mirror': 0,
-            'dashboard': 0,
-            'road': 0,
-            'other': 0
-        }
+        self.alert_service = AlertService(self.alert_sound_path)
+        # Per-frame gaze events are only persisted for a logged-in driver
+        self.gaze_writer = GazeEventWriter() if username else None
+        self.session_store = SessionStore() if username else None
+        self.session_id = None
+        self.session_exporter = None
+        self.sessions_dir = 'src/data/sessions'
+        self.engagement_data = new_engagement_data()
+        # Live session metrics, updated per result and readable at any time
+        self.metrics = MetricsAccumulator()
         self.start_time = None
         self.frame_count = 0
-        self.missing_eye_start_time = None
         self.total_time = 0
         self.is_tracking = False
 
@@ -41,8 +67,28 @@ class DriverMonitoringSystem:
             self.user_face_descriptor = None
             print("User calibration data not found. Please perform calibration first.")
 
-    def play_alert_sound(self):
-        playsound(self.alert_sound_path)
+        self.engine = MonitoringEngine(self.face_detector, self.eye_tracker, self.identity_verifier,
+                                       user_face_descriptor=self.user_face_descriptor,
+                                       drowsiness=DrowsinessMonitor())
+        self.engine.subscribe(self.on_result)
+        # Capture, detection, landmarking and classification overlap on their own threads;
+        # update_tracking then only hands finished results to the subscribers
+        self.pipeline = MonitoringPipeline(self.engine, self.camera) if pipelined else None
+        # Trades detection/recognition quality and frame rate for time when frames cost more than the budget
+        self.governor = FrameRateGovernor(self.face_detector, self.identity_verifier, self.pipeline,
+                                          budget_ms=latency_budget_ms)
+        self.ticks = 0
+        self.overlay = None
+        if not headless:
+            self.overlay = OverlayRenderer(eye_tracker=self.eye_tracker)
+            self.engine.subscribe(self.overlay.on_result)
+        # Prometheus endpoint for fleet gateways; DMS_METRICS_PORT switches it on without code changes
+        if metrics_port is None and os.environ.get('DMS_METRICS_PORT'):
+            metrics_port = int(os.environ['DMS_METRICS_PORT'])
+        self.metrics_server = serve_metrics(self, port=metrics_port) if metrics_port is not None else None
+
+    def play_alert_sound(self, level=1):
+        self.alert_service.trigger(level)
 
     def start_tracking(self):
         if self.user_face_descriptor is None:
@@ -50,60 +96,81 @@ class DriverMonitoringSystem:
             return
 
         self.is_tracking = True
+        self.camera.open()
+        self.alert_service.start()
         self.start_time = time.time()
+        if self.gaze_writer is not None:
+            self.session_id = self.session_store.start_session(self.username, self.start_time)
+            self.gaze_writer.session_id = self.session_id
+            self.gaze_writer.start()
+            self.session_exporter = SessionExporter(os.path.join(self.sessions_dir, self.username, str(self.session_id)),
+                                                    metadata={'user': self.username, 'session_id': self.session_id,
+                                                              'started_at': self.start_time})
         self.frame_count = 0
-        self.engagement_data = {
-            'rearview_mirror': 0,
-            'left_side_mirror': 0,
-            'right_side_mirror': 0,
-            'dashboard': 0,
-            'road': 0,
-            'other': 0
-        }
-
-        print("Starting calibration...")
-        self.calibration_points = get_calibration_data(self.camera, self.face_detector, self.eye_tracker)
+        self.engine.reset()
+        self.engagement_data = new_engagement_data()
+        self.metrics.reset()
+        self.governor.reset()
+        self.ticks = 0
+
+        if self.headless:
+            # Calibration needs the driver at the screen, so headless runs use the stored calibration only
+            self.calibration_points = load_calibration_data()
+        else:
+            print("Starting calibration...")
+            self.calibration_points = get_calibration_data(self.camera, self.face_detector, self.eye_tracker)
+        self.zone_classifier = GazeZoneClassifier(self.calibration_points) if self.calibration_points is not None else None
+        self.engine.zone_classifier = self.zone_classifier
         print("Calibration completed. Starting monitoring...")
+        if self.pipeline is not None:
+            self.pipeline.start()
 
     def update_tracking(self):
         if not self.is_tracking:
             return
 
-        frame = self.camera.get_frame()
-        if frame is None:
-            return
-
-        face = self.face_detector.detect_face(frame)
-        self.face_detector.draw_detected_face(frame, face)
-        eye_positions = None
-        if face is not None and self.face_detector.recognize_user_face(frame, face, self.user_face_descriptor):
-            left_eye, right_eye = self.eye_tracker.track_eyes(frame, face)
-            if self.eye_tracker.validate_eyes(left_eye, right_eye, frame):
-                eye_positions = [left_eye, right_eye]
-                engagement_point = calculate_engagement_rate(eye_positions, self.calibration_points)
-                if engagement_point:
-                    self.engagement_data[engagement_point] += 1
-                else:
-                    self.engagement_data['other'] += 1
-
-                # Display engagement point on the frame
-                self.camera.display_engagement(frame, engagement_point)
+        tick_start = time.perf_counter()
+        with tracing.span('update_tracking'):
+            if self.pipeline is not None:
+                results = self.pipeline.drain()
             else:
-                eye_positions = None
-
-        if eye_positions is None:
-            if self.missing_eye_start_time is None:
-                self.missing_eye_start_time = time.time()
-            elif time.time() - self.missing_eye_start_time >= 3:
-                cv2.putText(frame, "LOOK AT THE ROAD", (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
-                if time.time() - self.missing_eye_start_time >= 5:
-                    self.play_alert_sound()
-        else:
-            self.missing_eye_start_time = None
-
+                results = []
+                self.ticks += 1
+                frame = self.camera.get_frame() if self.ticks % self.governor.frame_stride() == 0 else None
+                if frame is not None:
+                    results.append(self.engine.process(frame))
+                    self.camera.frame_processed()
+        tick_seconds = time.perf_counter() - tick_start
+        self.governor.observe_tick(tick_seconds)
+        if tracing.is_enabled():
+            # Serially a frame costs the whole tick; pipelined, its stage times (they ran on other threads)
+            for result in results:
+                tracing.frame_finished(result.frame_id, tick_seconds if self.pipeline is None
+                                       else sum(result.stage_seconds.values()))
+
+    def on_result(self, result):
+        count_engagement(self.engagement_data, result)
+        self.metrics.update(result)
+        self.governor.observe(result)
+        if self.metrics_server is not None:
+            self.metrics_server.observe(result)
+        if self.gaze_writer is not None:
+            self.gaze_writer.log(self.username, result)
+        if self.session_exporter is not None:
+            self.session_exporter.append(result)
+        if result.eyes_valid:
+            self.alert_service.clear()
+        elif result.alert_level is not None:
+            self.play_alert_sound(result.alert_level)
+        if result.drowsiness_event == 'microsleep_start':
+            self.alert_service.trigger(3, key='microsleep')
+        elif result.drowsiness_event == 'microsleep_end':
+            self.alert_service.clear('microsleep')
+
+        if self.frame_count == 0:
+            mark_startup('first_frame_processed')
+            print_startup_report()
         self.frame_count += 1
-        cv2.imshow("Driver Monitoring System", frame)
-        cv2.waitKey(1)
 
     def stop_tracking(self):
         if not self.is_tracking:
@@ -111,8 +178,48 @@ class DriverMonitoringSystem:
 
         self.is_tracking = False
         self.total_time = time.time() - self.start_time
-        generate_metrics_report(self.engagement_data, self.total_time, self.frame_count)
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            self.pipeline.drain()
+            print(f"Pipeline stats: {self.pipeline.get_stats()}")
+        print(f"Camera stats: {self.camera.get_stats()}")
+        print(f"Identity verification stats: {self.identity_verifier.get_stats()}")
+        print(f"Face detection stats: {self.face_detector.detection_stats}")
+        self.alert_service.stop()
+        print(f"Alert stats: {self.alert_service.get_stats()}")
+        if self.gaze_writer is not None:
+            self.gaze_writer.stop()
+            print(f"Gaze event writer stats: {self.gaze_writer.get_stats()}")
+        print(f"Governor stats: {self.governor.get_stats()}")
+        drowsiness = self.engine.drowsiness
+        print(f"Drowsiness stats: {drowsiness.get_stats()}, closed eyes score: "
+              f"{evaluate_closed_eyes([duration for _, duration in drowsiness.microsleeps])}")
+        self.governor.save_log('src/data/governor_log.json')
+        if tracing.is_enabled():
+            print(f"Tracing stats: {tracing.get_stats()}")
+            print(f"Writing trace to {tracing.dump_trace(background=True)}")
+        if self.session_exporter is not None:
+            self.governor.save_log(os.path.join(self.session_exporter.directory, 'governor.json'))
+            self.session_exporter.close()
+            self.session_exporter = None
+        # Dwell times come from frame timestamps, so calibration time before the first frame is not counted.
+        # Charts are rendered on a background thread; stopping does not wait for matplotlib.
+        report = self.metrics.report()
+        write_report_data(report)
+        print_metrics_report(report)
+        render_charts_async(report['engagement_percentage'], report['total_engagement_time'])
+        if self.session_id is not None:
+            self.session_store.end_session(self.session_id, self.start_time + self.total_time, self.frame_count,
+                                           report['engagement_score'])
+            self.session_id = None
         self.camera.release()
-        cv2.destroyAllWindows()
-
-    
+        if not self.headless:
+            cv2.destroyAllWindows()
+
+    def close(self):
+        # Teardown when the system is discarded (logout, window closed): ends a running session and
+        # frees the metrics port, unless another system has since taken the endpoint over
+        self.stop_tracking()
+        if self.metrics_server is not None and self.metrics_server.system is self:
+            self.metrics_server.stop()
+        self.metrics_server = None
@@ -0,0 +1,280 @@
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from core.model_registry import get_startup_report
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# One server per (host, port) in the process; see serve_metrics
+_servers = {}
+_servers_lock = threading.Lock()
+
+# Upper bounds in seconds; stage times sit between a fraction of a millisecond (classify) and tens (detection)
+STAGE_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.015, 0.025, 0.033, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0)
+
+class Histogram:
+    # Cumulative bucket counts as Prometheus expects them; observe() is a bisect and two additions
+    def __init__(self, buckets=STAGE_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        counts = list(self.counts)
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float('inf'),), counts):
+            cumulative += count
+            yield ('+Inf' if bound == float('inf') else repr(bound)), cumulative
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+def _labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+def _rss_bytes():
+    # Current resident set size from /proc on Linux; peak RSS from getrusage elsewhere
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _peak_rss_bytes():
+    if resource is None:
+        return None
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+class MetricsWriter:
+    # Collects lines for one scrape in Prometheus text exposition format (version 0.0.4)
+    def __init__(self):
+        self.lines = []
+        self._declared = set()
+
+    def declare(self, name, metric_type, help_text):
+        if name in self._declared:
+            return
+        self._declared.add(name)
+        self.lines.append(f'# HELP {name} {help_text}')
+        self.lines.append(f'# TYPE {name} {metric_type}')
+
+    def sample(self, name, metric_type, help_text, value, labels=None):
+        if value is None:
+            return
+        self.declare(name, metric_type, help_text)
+        self.lines.append(f'{name}{_labels(labels)} {float(value)!r}')
+
+    def histogram(self, name, help_text, histogram, labels=None):
+        self.declare(name, 'histogram', help_text)
+        labels = labels or {}
+        for bound, cumulative in histogram.samples():
+            self.lines.append(f'{name}_bucket{_labels(dict(labels, le=bound))} {cumulative}')
+        self.lines.append(f'{name}_sum{_labels(labels)} {histogram.sum!r}')
+        self.lines.append(f'{name}_count{_labels(labels)} {histogram.count}')
+
+    def text(self):
+        return '\n'.join(self.lines) + '\n'
+
+class MetricsServer:
+    # Serves the running DriverMonitoringSystem's health at http://host:port/metrics for Prometheus.
+    # The frame loop only calls observe() (histogram updates); everything else is read from the
+    # components' own counters when a scrape arrives, on the server's background thread.
+    def __init__(self, system, host='127.0.0.1', port=9108, buckets=STAGE_BUCKETS):
+        self.system = system
+        self.host = host
+        self.port = port
+        self.buckets = buckets
+        self.stage_histograms = {}
+        self.frame_histogram = Histogram(buckets)
+        self.alert_levels = {}
+        self.scrapes = 0
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] not in ('/metrics', '/'):
+                    self.send_error(404)
+                    return
+                body = server.render().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True)
+        self._thread.start()
+        print(f"Metrics endpoint at http://{self.host}:{self.port}/metrics")
+
+    def attach(self, system):
+        # Point the endpoint at another system (e.g. after logout and login); its counters start over
+        self.system = system
+        self.stage_histograms = {}
+        self.frame_histogram = Histogram(self.buckets)
+        self.alert_levels = {}
+
+    def stop(self):
+        with _servers_lock:
+            if _servers.get((self.host, self.port)) is self:
+                del _servers[(self.host, self.port)]
+        if self._thread is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join(timeout=1.0)
+        self._server = None
+        self._thread = None
+
+    def observe(self, result):
+        for name, seconds in result.stage_seconds.items():
+            histogram = self.stage_histograms.get(name)
+            if histogram is None:
+                histogram = self.stage_histograms[name] = Histogram(self.buckets)
+            histogram.observe(seconds)
+        if result.stage_seconds:
+            self.frame_histogram.observe(sum(result.stage_seconds.values()))
+        if result.alert_level is not None:
+            self.alert_levels[result.alert_level] = self.alert_levels.get(result.alert_level, 0) + 1
+
+    def render(self):
+        start = time.perf_counter()
+        self.scrapes += 1
+        out = MetricsWriter()
+        system = self.system
+        out.sample('dms_up', 'gauge', "1 while the monitoring system is running.", 1)
+        out.sample('dms_tracking', 'gauge', "1 while a monitoring session is active.", int(system.is_tracking))
+        out.sample('dms_frames_processed_total', 'counter', "Frames that produced a monitoring result this session.",
+                   system.frame_count)
+
+        for name, histogram in list(self.stage_histograms.items()):
+            out.histogram('dms_stage_latency_seconds', "Time spent in each engine stage per frame.", histogram,
+                          {'stage': name})
+        out.histogram('dms_frame_latency_seconds', "Sum of engine stage times per frame.", self.frame_histogram)
+
+        camera = system.camera.get_stats()
+        out.sample('dms_camera_frames_captured_total', 'counter', "Frames read from the camera.",
+                   camera.get('frames_captured'))
+        out.sample('dms_camera_frames_dropped_total', 'counter', "Camera frames overwritten before being processed.",
+                   camera.get('frames_dropped'))
+        out.sample('dms_camera_read_failures_total', 'counter', "Failed camera reads.", camera.get('read_failures'))
+
+        if system.pipeline is not None:
+            pipeline = system.pipeline.get_stats()
+            out.sample('dms_pipeline_frames_submitted_total', 'counter', "Frames submitted to the pipeline.",
+                       pipeline['frames_submitted'])
+            out.sample('dms_pipeline_results_dropped_total', 'counter', "Finished results dropped before being drained.",
+                       pipeline['results_dropped'])
+            for name, stage in pipeline['stages'].items():
+                labels = {'stage': name}
+                out.sample('dms_pipeline_frames_dropped_total', 'counter', "Frames evicted from a full stage queue.",
+                           stage['dropped'], labels)
+                out.sample('dms_pipeline_stage_errors_total', 'counter', "Frames a stage failed on.", stage['errors'], labels)
+                out.sample('dms_pipeline_queue_depth', 'gauge', "Frames waiting in a stage queue.", stage['queue_depth'],
+                           labels)
+
+        identity = system.identity_verifier.get_stats()
+        out.sample('dms_identity_verifications_total', 'counter', "Full face descriptor verifications.",
+                   identity['verifications'])
+        out.sample('dms_identity_cache_hits_total', 'counter', "Frames whose identity came from the verification cache.",
+                   identity['cache_hits'])
+        out.sample('dms_identity_cache_hit_ratio', 'gauge', "Share of frames served by the verification cache.",
+                   identity['hit_rate'])
+        for kind, count in dict(system.face_detector.detection_stats).items():
+            out.sample('dms_face_detections_total', 'counter', "Face detections by kind (full frame or tracked ROI).",
+                       count, {'kind': kind})
+
+        alerts = system.alert_service.get_stats()
+        for outcome in ('triggered', 'played', 'suppressed_duplicate', 'suppressed_cooldown', 'errors'):
+            out.sample('dms_alerts_total', 'counter', "Alert triggers by outcome.", alerts[outcome], {'outcome': outcome})
+        for level, count in sorted(self.alert_levels.items()):
+            out.sample('dms_alert_level_frames_total', 'counter', "Frames at each eyes-missing alert level.", count,
+                       {'level': level})
+
+        for zone, count in dict(system.engagement_data).items():
+            out.sample('dms_zone_frames_total', 'counter', "Frames classified into each gaze zone.", count,
+                       {'zone': zone})
+        dwell, eyes_missing, elapsed = system.metrics.dwell_totals()
+        for zone, seconds in dwell.items():
+            out.sample('dms_zone_dwell_seconds_total', 'counter', "Seconds spent looking at each gaze zone.", seconds,
+                       {'zone': zone})
+        out.sample('dms_eyes_missing_seconds_total', 'counter', "Seconds without valid eyes.", eyes_missing)
+        out.sample('dms_session_seconds_total', 'counter', "Seconds covered by this session's frames.", elapsed)
+        out.sample('dms_engagement_score_rolling', 'gauge', "Engagement score over the rolling window.",
+                   system.metrics.rolling_score())
+
+        drowsiness = system.engine.drowsiness
+        if drowsiness is not None:
+            out.sample('dms_perclos_ratio', 'gauge', "Share of the window with eyes closed.", drowsiness.perclos())
+            out.sample('dms_blink_rate_per_minute', 'gauge', "Blinks per minute over the window.", drowsiness.blink_rate())
+            out.sample('dms_microsleeps_total', 'counter', "Microsleeps this session.", len(drowsiness.microsleeps))
+
+        governor = system.governor.get_stats()
+        out.sample('dms_governor_level', 'gauge', "Current frame-rate governor quality level (0 is best).",
+                   governor['level'])
+        out.sample('dms_effective_fps', 'gauge', "Frames per second measured by the governor.", governor['effective_fps'])
+        out.sample('dms_frame_budget_seconds', 'gauge', "Per-frame latency budget.", governor['budget_ms'] / 1000)
+
+        if system.gaze_writer is not None:
+            writer = system.gaze_writer.get_stats()
+            out.sample('dms_gaze_events_written_total', 'counter', "Gaze events written to the database.",
+                       writer['written'])
+            out.sample('dms_gaze_events_dropped_total', 'counter', "Gaze events dropped with a full writer queue.",
+                       writer['dropped'])
+
+        out.sample('dms_process_resident_memory_bytes', 'gauge', "Resident set size of the process.", _rss_bytes())
+        out.sample('dms_process_peak_resident_memory_bytes', 'gauge', "Peak resident set size of the process.",
+                   _peak_rss_bytes())
+        startup = get_startup_report()
+        for model, seconds in startup['model_load_seconds'].items():
+            out.sample('dms_model_load_seconds', 'gauge', "Time taken to load each model.", seconds, {'model': model})
+        for event, seconds in startup['events_seconds'].items():
+            out.sample('dms_startup_event_seconds', 'gauge', "Seconds from process start to each startup event.",
+                       seconds, {'event': event})
+
+        out.sample('dms_metrics_scrapes_total', 'counter', "Scrapes served by this endpoint.", self.scrapes)
+        out.sample('dms_metrics_scrape_duration_seconds', 'gauge', "Time taken to render this scrape.",
+                   time.perf_counter() - start)
+        return out.text()
+
+def serve_metrics(system, host='127.0.0.1', port=9108):
+    # A port can only be bound once per process, so a second DriverMonitoringSystem takes over the
+    # running server instead of starting its own. Returns None if the port is taken by another process.
+    with _servers_lock:
+        server = _servers.get((host, port))
+        if server is not None:
+            server.attach(system)
+            return server
+        server = MetricsServer(system, host=host, port=port)
+        try:
+            server.start()
+        except OSError as e:
+            print(f"Metrics endpoint not started on {host}:{port}: {e}")
+            return None
+        _servers[(host, server.port)] = server
+        return server
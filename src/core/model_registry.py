@@ -0,0 +1,63 @@
+import os
+import threading
+import time
+import dlib
+
+models_dir = os.path.join(os.path.dirname(__file__), '..', 'models')
+
+# Each model is loaded once per process, on first use, and the same handle is shared by every caller
+MODEL_LOADERS = {
+    'shape_predictor': lambda: dlib.shape_predictor(os.path.join(models_dir, 'shape_predictor_68_face_landmarks_GTX.dat')),
+    'face_recognition': lambda: dlib.face_recognition_model_v1(os.path.join(models_dir, 'dlib_face_recognition_resnet_model_v1.dat')),
+    'frontal_face_detector': dlib.get_frontal_face_detector,
+}
+
+_startup_t0 = time.perf_counter()
+_models = {}
+_load_times = {}
+_startup_events = {}
+_lock = threading.Lock()
+
+def get_model(name):
+    model = _models.get(name)
+    if model is not None:
+        return model
+    with _lock:
+        if name not in _models:
+            if name not in MODEL_LOADERS:
+                raise ValueError(f"Unknown model '{name}'. Available: {', '.join(MODEL_LOADERS)}")
+            start = time.perf_counter()
+            _models[name] = MODEL_LOADERS[name]()
+            _load_times[name] = time.perf_counter() - start
+            print(f"Loaded model {name} in {_load_times[name]:.2f} s")
+        return _models[name]
+
+def get_shape_predictor():
+    return get_model('shape_predictor')
+
+def get_face_recognition_model():
+    return get_model('face_recognition')
+
+def get_frontal_face_detector():
+    return get_model('frontal_face_detector')
+
+def mark_startup(event):
+    # Only the first occurrence of an event is kept, measured from when this module was imported
+    _startup_events.setdefault(event, time.perf_counter() - _startup_t0)
+
+def get_startup_report():
+    return {
+        'model_load_seconds': dict(_load_times),
+        'total_model_load_seconds': sum(_load_times.values()),
+        'events_seconds': dict(sorted(_startup_events.items(), key=lambda item: item[1])),
+    }
+
+def print_startup_report():
+    report = get_startup_report()
+    print("\nStartup Timing Report:")
+    print("----------------------------")
+    for name, seconds in report['model_load_seconds'].items():
+        print(f"model {name}: {seconds:.2f} s")
+    print(f"total model load: {report['total_model_load_seconds']:.2f} s")
+    for event, seconds in report['events_seconds'].items():
+        print(f"{event}: {seconds:.2f} s after start")
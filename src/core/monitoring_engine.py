@@ -0,0 +1,145 @@
+import time
+from core.frame_context import FrameContext
+from core.landmarks import mean_eye_aspect_ratio
+from core import tracing
+
+class MonitoringResult:
+    def __init__(self, frame_id, timestamp, frame):
+        self.frame_id = frame_id
+        self.timestamp = timestamp
+        self.frame = frame
+        self.face = None
+        self.recognized = False
+        self.landmarks = None
+        self.left_eye = None
+        self.right_eye = None
+        self.eyes_valid = False
+        self.gaze_zone = None
+        self.ear = None
+        self.eyes_missing_seconds = 0.0
+        self.show_warning = False
+        self.alert_level = None
+        self.perclos = None
+        self.blink_rate = None
+        self.drowsiness_event = None
+        self.microsleep = False
+        # Seconds spent in each engine stage for this frame
+        self.stage_seconds = {}
+
+    def to_dict(self):
+        return {
+            'frame_id': self.frame_id,
+            'timestamp': self.timestamp,
+            'face': None if self.face is None else [int(v) for v in self.face],
+            'recognized': bool(self.recognized),
+            'eyes_valid': self.eyes_valid,
+            'gaze_zone': self.gaze_zone,
+            'ear': self.ear,
+            'eyes_missing_seconds': self.eyes_missing_seconds,
+            'alert_level': self.alert_level,
+            'perclos': self.perclos,
+            'blink_rate': self.blink_rate,
+            'drowsiness_event': self.drowsiness_event,
+            'microsleep': self.microsleep,
+        }
+
+class MonitoringEngine:
+    # Headless perception: takes frames, emits MonitoringResult objects to subscribers.
+    # Nothing here draws or opens a window; rendering is an optional subscriber (core.overlay).
+    def __init__(self, face_detector, eye_tracker, identity_verifier, zone_classifier=None,
+                 user_face_descriptor=None, warning_after=3, alert_escalation=None, drowsiness=None):
+        self.face_detector = face_detector
+        self.eye_tracker = eye_tracker
+        self.identity_verifier = identity_verifier
+        self.zone_classifier = zone_classifier
+        # Optional core.drowsiness.DrowsinessMonitor fed with every frame's EAR
+        self.drowsiness = drowsiness
+        self.user_face_descriptor = user_face_descriptor
+        self.warning_after = warning_after
+        # Seconds without eyes before each alert escalation level
+        self.alert_escalation = alert_escalation or {1: 5, 2: 8, 3: 12}
+        self.subscribers = []
+        self.frame_id = 0
+        self.missing_eye_start_time = None
+
+    def subscribe(self, callback):
+        self.subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self.subscribers:
+            self.subscribers.remove(callback)
+
+    def reset(self):
+        self.frame_id = 0
+        self.missing_eye_start_time = None
+        self.identity_verifier.reset()
+        self.face_detector.reset_tracking()
+        if self.drowsiness is not None:
+            self.drowsiness.reset()
+
+    def process(self, frame, timestamp=None):
+        result, context = self.begin(frame, timestamp)
+        for name, stage in (('detect', self.detect), ('landmark', self.landmark), ('classify', self.classify)):
+            start = time.perf_counter()
+            with tracing.span(name, result.frame_id):
+                stage(result, context)
+            result.stage_seconds[name] = time.perf_counter() - start
+        self.publish(result)
+        return result
+
+    # The stages below are what process() runs in order; core.pipeline runs each on its own thread.
+    # detect and classify keep per-stream state (face tracking, identity cache, eyes-missing timer),
+    # so each must see frames in sequence order.
+
+    def begin(self, frame, timestamp=None):
+        # timestamp lets recorded video drive the eyes-missing timers in video time
+        if timestamp is None:
+            timestamp = time.time()
+        result = MonitoringResult(self.frame_id, timestamp, frame)
+        context = FrameContext(frame, self.frame_id)
+        self.frame_id += 1
+        return result, context
+
+    def detect(self, result, context):
+        with tracing.span('detect_face', result.frame_id):
+            face = self.face_detector.detect_face(result.frame, context)
+        context.set_face(face)
+        result.face = face
+        with tracing.span('verify_identity', result.frame_id):
+            result.recognized = self.identity_verifier.verify(result.frame, face, self.user_face_descriptor, context)
+
+    def landmark(self, result, context):
+        if not result.recognized:
+            return
+        with tracing.span('track_eyes', result.frame_id):
+            left_eye, right_eye = self.eye_tracker.track_eyes(result.frame, result.face, context, draw=False)
+        result.landmarks = context.landmarks
+        result.left_eye, result.right_eye = left_eye, right_eye
+        if self.eye_tracker.validate_eyes(left_eye, right_eye, result.frame):
+            result.eyes_valid = True
+            result.ear = mean_eye_aspect_ratio(left_eye, right_eye)
+
+    def classify(self, result, context=None):
+        if result.eyes_valid and self.zone_classifier is not None:
+            result.gaze_zone = self.zone_classifier.classify([result.left_eye, result.right_eye])
+
+        if not result.eyes_valid:
+            if self.missing_eye_start_time is None:
+                self.missing_eye_start_time = result.timestamp
+            result.eyes_missing_seconds = result.timestamp - self.missing_eye_start_time
+            result.show_warning = result.eyes_missing_seconds >= self.warning_after
+            result.alert_level = max((level for level, seconds in self.alert_escalation.items()
+                                      if result.eyes_missing_seconds >= seconds), default=None)
+        else:
+            self.missing_eye_start_time = None
+
+        if self.drowsiness is not None:
+            result.drowsiness_event = self.drowsiness.update(result.ear, result.timestamp)
+            result.perclos = self.drowsiness.perclos()
+            result.blink_rate = self.drowsiness.blink_rate()
+            result.microsleep = self.drowsiness.microsleep_active
+
+    def publish(self, result):
+        for callback in self.subscribers:
+            with tracing.span(f"publish.{getattr(callback, '__qualname__', 'subscriber')}", result.frame_id):
+                callback(result)
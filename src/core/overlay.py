@@ -0,0 +1,33 @@
+import cv2
+from core import tracing
+
+class OverlayRenderer:
+    # Optional rendering stage: subscribe on_result to a MonitoringEngine to draw and show its results
+    def __init__(self, window_name="Driver Monitoring System", eye_tracker=None):
+        self.window_name = window_name
+        self.eye_tracker = eye_tracker
+
+    def draw(self, frame, result):
+        if result.face is not None:
+            x, y, w, h = result.face
+            cv2.rectangle(frame, (int(x), int(y)), (int(x + w), int(y + h)), (255, 0, 0), 2)
+        if result.left_eye is not None and self.eye_tracker is not None:
+            for eye in (result.left_eye, result.right_eye):
+                self.eye_tracker.draw_eye_contours(frame, eye)
+                self.eye_tracker.draw_iris_cross(frame, eye)
+        if result.eyes_valid and result.gaze_zone:
+            cv2.putText(frame, f"Engagement: {result.gaze_zone}", (10, 30),
+                        cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2, cv2.LINE_AA)
+        if result.show_warning:
+            cv2.putText(frame, "LOOK AT THE ROAD", (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+        return frame
+
+    def on_result(self, result):
+        with tracing.span('overlay_draw', result.frame_id):
+            self.draw(result.frame, result)
+        with tracing.span('imshow', result.frame_id):
+            cv2.imshow(self.window_name, result.frame)
+            cv2.waitKey(1)
+
+    def close(self):
+        cv2.destroyWindow(self.window_name)
@@ -0,0 +1,282 @@
+import heapq
+import queue
+import threading
+import time
+from collections import deque
+import numpy as np
+from core import tracing
+
+def put_latest(stage_queue, item):
+    # Bounded queue that keeps the newest work: when full, the oldest item is evicted and returned
+    evicted = None
+    while True:
+        try:
+            stage_queue.put_nowait(item)
+            return evicted
+        except queue.Full:
+            try:
+                evicted = stage_queue.get_nowait()
+            except queue.Empty:
+                pass
+
+class PipelineItem:
+    def __init__(self, seq, result, context, captured_at, generation=0):
+        self.seq = seq
+        # Which start() the item belongs to; items from an earlier run are discarded, never published
+        self.generation = generation
+        self.result = result
+        self.context = context
+        self.captured_at = captured_at
+        self.enqueued_at = captured_at
+
+class PipelineStage:
+    def __init__(self, name, work, queue_size, stats_window):
+        self.name = name
+        self.work = work
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.latencies = deque(maxlen=stats_window)
+        self.waits = deque(maxlen=stats_window)
+        self.max_depth = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def reset(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                break
+        self.latencies.clear()
+        self.waits.clear()
+        self.max_depth = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+
+    def get_stats(self):
+        def summarize(samples):
+            if not samples:
+                return {'mean_ms': 0.0, 'p95_ms': 0.0}
+            values = np.fromiter(samples, dtype=np.float64) * 1000
+            return {'mean_ms': float(values.mean()), 'p95_ms': float(np.percentile(values, 95))}
+
+        return {
+            'queue_depth': self.queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'processed': self.processed,
+            'dropped': self.dropped,
+            'errors': self.errors,
+            'latency': summarize(self.latencies),
+            'queue_wait': summarize(self.waits),
+        }
+
+class MonitoringPipeline:
+    # Runs the MonitoringEngine stages on separate threads, connected by small bounded queues:
+    #   capture -> detect -> landmark -> classify -> results
+    # so a frame can be landmarked while the next one is being detected. The OpenCV and dlib calls
+    # inside the stages release the GIL for most of their runtime, which is where the overlap comes from.
+    # When a stage falls behind, its queue drops the oldest frame instead of building up lag.
+    # Results come back in sequence order through drain(), on the caller's thread, so subscribers
+    # that draw with HighGUI or wx keep running on the GUI thread.
+    def __init__(self, engine, camera=None, queue_size=2, result_queue_size=30, landmark_workers=1, stats_window=300):
+        self.engine = engine
+        self.camera = camera
+        self.landmark_workers = landmark_workers
+        # Only every frame_stride-th captured frame enters the pipeline (set by core.governor)
+        self.frame_stride = 1
+        self._captured = 0
+        self.stages = [
+            PipelineStage('detect', lambda item: engine.detect(item.result, item.context), queue_size, stats_window),
+            PipelineStage('landmark', lambda item: engine.landmark(item.result, item.context), queue_size, stats_window),
+            PipelineStage('classify', lambda item: engine.classify(item.result, item.context), queue_size, stats_window),
+        ]
+        self.results = queue.Queue(maxsize=result_queue_size)
+        self.end_to_end = deque(maxlen=stats_window)
+        self.frames_submitted = 0
+        self.results_dropped = 0
+        self._seq = 0
+        self._next_seq = 0
+        self._pending = []
+        self._skipped = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._threads = []
+        self._running = False
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self.reset()
+        targets = [('detect', self._run_stage, (0,))]
+        targets += [(f'landmark-{i}', self._run_stage, (1,)) for i in range(self.landmark_workers)]
+        targets.append(('classify', self._run_classify, ()))
+        if self.camera is not None:
+            targets.insert(0, ('capture', self._run_capture, ()))
+        for name, target, args in targets:
+            thread = threading.Thread(target=target, args=args, name=f"Pipeline-{name}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def reset(self):
+        # A new run starts from empty queues and counters. Frames left over from the previous run
+        # would otherwise be published into this one and collide with its sequence numbers; a stage
+        # thread from that run still finishing a frame is caught by the generation check.
+        with self._lock:
+            self._generation += 1
+            self._seq = 0
+            self._next_seq = 0
+            self._pending = []
+            self._skipped = set()
+        for stage in self.stages:
+            stage.reset()
+        while True:
+            try:
+                self.results.get_nowait()
+            except queue.Empty:
+                break
+        self.end_to_end.clear()
+        self.frames_submitted = 0
+        self.results_dropped = 0
+        self._captured = 0
+
+    def stop(self, timeout=1.0):
+        self._running = False
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    def submit(self, frame, timestamp=None, captured_at=None):
+        # The frame must not be reused by the caller; the camera ring slots are, so capture copies them
+        with self._lock:
+            seq = self._seq
+            self._seq += 1
+            generation = self._generation
+        result, context = self.engine.begin(frame, timestamp)
+        item = PipelineItem(seq, result, context, captured_at or time.monotonic(), generation)
+        self.frames_submitted += 1
+        self._enqueue(0, item)
+        return seq
+
+    def _run_capture(self):
+        while self._running:
+            frame = self.camera.get_frame(timeout=0.1)
+            if frame is None:
+                continue
+            self._captured += 1
+            if self._captured % self.frame_stride:
+                continue
+            self.submit(frame.copy(), captured_at=self.camera.last_frame_timestamp)
+
+    def _enqueue(self, index, item):
+        if item.generation != self._generation:
+            return
+        stage = self.stages[index]
+        item.enqueued_at = time.monotonic()
+        evicted = put_latest(stage.queue, item)
+        stage.max_depth = max(stage.max_depth, stage.queue.qsize())
+        if evicted is not None:
+            stage.dropped += 1
+            self._skip(evicted.seq)
+            if tracing.is_enabled():
+                now = time.perf_counter()
+                tracing.add_span(f'dropped.{stage.name}', now, now, evicted.result.frame_id)
+
+    def _skip(self, seq):
+        # Dropped or failed frames are skipped by the reorder step rather than waited for
+        with self._lock:
+            self._skipped.add(seq)
+
+    def _take(self, stage):
+        try:
+            item = stage.queue.get(timeout=0.1)
+        except queue.Empty:
+            return None
+        if item.generation != self._generation:
+            return None
+        wait = time.monotonic() - item.enqueued_at
+        stage.waits.append(wait)
+        if tracing.is_enabled():
+            now = time.perf_counter()
+            tracing.add_span(f'queue_wait.{stage.name}', now - wait, now, item.result.frame_id)
+        return item
+
+    def _work(self, stage, item):
+        start = time.monotonic()
+        try:
+            with tracing.span(stage.name, item.result.frame_id):
+                stage.work(item)
+        except Exception as e:
+            stage.errors += 1
+            print(f"Pipeline stage {stage.name} failed on frame {item.seq}: {e}")
+            self._skip(item.seq)
+            return False
+        elapsed = time.monotonic() - start
+        item.result.stage_seconds[stage.name] = elapsed
+        stage.latencies.append(elapsed)
+        stage.processed += 1
+        return True
+
+    def _run_stage(self, index):
+        stage = self.stages[index]
+        while self._running:
+            item = self._take(stage)
+            if item is not None and self._work(stage, item):
+                self._enqueue(index + 1, item)
+
+    def _run_classify(self):
+        # classify keeps the eyes-missing timer, so frames are put back in sequence order first;
+        # with several landmark workers they can arrive out of order
+        stage = self.stages[-1]
+        while self._running:
+            item = self._take(stage)
+            if item is not None:
+                with self._lock:
+                    # id() breaks ties so heapq never has to compare PipelineItems
+                    if item.generation == self._generation:
+                        heapq.heappush(self._pending, (item.seq, id(item), item))
+            for ready in self._pop_in_order():
+                if self._work(stage, ready) and ready.generation == self._generation:
+                    self.end_to_end.append(time.monotonic() - ready.captured_at)
+                    if put_latest(self.results, ready.result) is not None:
+                        self.results_dropped += 1
+
+    def _pop_in_order(self):
+        ready = []
+        with self._lock:
+            while True:
+                if self._next_seq in self._skipped:
+                    self._skipped.discard(self._next_seq)
+                    self._next_seq += 1
+                elif self._pending and self._pending[0][0] == self._next_seq:
+                    ready.append(heapq.heappop(self._pending)[2])
+                    self._next_seq += 1
+                elif self._pending and self._pending[0][0] < self._next_seq:
+                    heapq.heappop(self._pending)
+                else:
+                    return ready
+
+    def drain(self, max_results=None):
+        # Publishes finished results to the engine's subscribers on the calling thread
+        published = []
+        while max_results is None or len(published) < max_results:
+            try:
+                result = self.results.get_nowait()
+            except queue.Empty:
+                break
+            self.engine.publish(result)
+            published.append(result)
+        return published
+
+    def get_stats(self):
+        latencies = np.fromiter(self.end_to_end, dtype=np.float64) * 1000 if self.end_to_end else None
+        return {
+            'frames_submitted': self.frames_submitted,
+            'results_dropped': self.results_dropped,
+            'stages': {stage.name: stage.get_stats() for stage in self.stages},
+            'end_to_end_latency': {
+                'mean_ms': float(latencies.mean()) if latencies is not None else 0.0,
+                'p95_ms': float(np.percentile(latencies, 95)) if latencies is not None else 0.0,
+            },
+        }
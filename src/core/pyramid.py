@@ -0,0 +1,19 @@
+import cv2
+import dlib
+
+def downscale_gray(gray, factor):
+    if factor <= 1:
+        return gray
+    return cv2.resize(gray, None, fx=1.0 / factor, fy=1.0 / factor, interpolation=cv2.INTER_AREA)
+
+def scale_rect(rect, factor):
+    if factor == 1:
+        return rect
+    return dlib.rectangle(int(rect.left() * factor), int(rect.top() * factor),
+                          int(rect.right() * factor), int(rect.bottom() * factor))
+
+def detect_faces(detector, gray, downscale=1, upsample=0):
+    # Detect on a downscaled copy and map the rects back, so landmarking and iris
+    # localisation still run on the native-resolution image.
+    small = downscale_gray(gray, downscale)
+    return [scale_rect(rect, downscale) for rect in detector(small, upsample)]
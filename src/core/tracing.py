@@ -0,0 +1,177 @@
+import json
+import os
+import signal
+import threading
+import time
+from collections import deque
+
+# Per-frame tracing spans, written as Chrome trace event JSON (chrome://tracing, ui.perfetto.dev).
+# Off by default; while off, span() hands back one shared no-op object, so the hooks cost a global
+# lookup per call. While on, each finished span is one tuple appended to a bounded deque, so the
+# buffer always holds the most recent spans and never grows. Switch on with enable() at runtime or
+# by starting the process with DMS_TRACE=1 (DMS_TRACE_BUDGET_MS sets the slow-frame budget).
+
+_enabled = False
+_events = deque(maxlen=200000)
+_thread_names = {}
+_budget_ms = None
+_trace_dir = 'src/data/traces'
+_dump_cooldown = 5.0
+# A slow-frame dump only covers the spans of the last few seconds, which keeps the trace it writes small
+_slow_frame_seconds = 2.0
+_last_dump = None
+_pid = os.getpid()
+_dump_lock = threading.Lock()
+_dump_thread = None
+stats = {'spans': 0, 'slow_frames': 0, 'dumps': 0, 'dumps_skipped': 0}
+
+class _Span:
+    __slots__ = ('name', 'frame_id', 'args', 'start')
+
+    def __init__(self, name, frame_id, args):
+        self.name = name
+        self.frame_id = frame_id
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        add_span(self.name, self.start, time.perf_counter(), self.frame_id, self.args)
+        return False
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_null_span = _NullSpan()
+
+def enable(budget_ms=None, buffer_size=None, trace_dir=None, dump_cooldown=None):
+    # budget_ms: frames whose cost goes over it dump the buffer (see frame_finished); None never does
+    global _enabled, _events, _budget_ms, _trace_dir, _dump_cooldown
+    if buffer_size is not None and buffer_size != _events.maxlen:
+        _events = deque(_events, maxlen=buffer_size)
+    if budget_ms is not None:
+        _budget_ms = budget_ms
+    if trace_dir is not None:
+        _trace_dir = trace_dir
+    if dump_cooldown is not None:
+        _dump_cooldown = dump_cooldown
+    _install_signal_handler()
+    _enabled = True
+    print(f"Tracing enabled (buffer {_events.maxlen} spans, slow-frame budget {_budget_ms} ms)")
+
+def disable():
+    global _enabled
+    _enabled = False
+
+def is_enabled():
+    return _enabled
+
+def clear():
+    _events.clear()
+
+def span(name, frame_id=None, **args):
+    if not _enabled:
+        return _null_span
+    return _Span(name, frame_id, args)
+
+def add_span(name, start, end, frame_id=None, args=None):
+    # start/end are time.perf_counter() values; used directly for spans measured elsewhere (e.g. queue waits)
+    if not _enabled:
+        return
+    thread = threading.current_thread()
+    if thread.ident not in _thread_names:
+        _thread_names[thread.ident] = thread.name
+    _events.append((name, start, end - start, thread.ident, frame_id, args))
+    stats['spans'] += 1
+
+def frame_finished(frame_id, seconds):
+    # Called once per finished frame with its cost; an over-budget frame dumps the buffer,
+    # at most once every dump_cooldown seconds so a run of slow frames gives one file
+    global _last_dump
+    if not _enabled or _budget_ms is None or seconds * 1000 <= _budget_ms:
+        return None
+    stats['slow_frames'] += 1
+    now = time.monotonic()
+    if _last_dump is not None and now - _last_dump < _dump_cooldown:
+        return None
+    _last_dump = now
+    path = os.path.join(_trace_dir, f'slow_frame_{frame_id}_{time.strftime("%Y%m%d_%H%M%S")}.json')
+    path = dump_trace(path, background=True, last_seconds=_slow_frame_seconds,
+                      slow_frame={'frame_id': frame_id, 'ms': seconds * 1000, 'budget_ms': _budget_ms})
+    if path is not None:
+        print(f"Frame {frame_id} took {seconds * 1000:.1f} ms (budget {_budget_ms:.1f} ms), writing trace to {path}")
+    return path
+
+def _recent_events(last_seconds):
+    # Pipeline threads keep appending while this runs, and iterating the deque itself would raise, so it
+    # works on a copy (list() of a deque is one C call under the GIL). Walks back from the newest span
+    # only as far as needed; spans end roughly in order.
+    cutoff = time.perf_counter() - last_seconds
+    events = list(_events)
+    first = len(events)
+    while first and events[first - 1][1] + events[first - 1][2] >= cutoff:
+        first -= 1
+    return events[first:]
+
+def to_chrome_trace(metadata=None, events=None, thread_names=None):
+    events = list(_events) if events is None else events
+    thread_names = dict(_thread_names) if thread_names is None else thread_names
+    trace_events = [{'name': 'process_name', 'ph': 'M', 'pid': _pid, 'tid': 0, 'args': {'name': 'DMS'}}]
+    for ident, name in thread_names.items():
+        trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': _pid, 'tid': ident, 'args': {'name': name}})
+    for name, start, duration, ident, frame_id, args in events:
+        event = {'name': name, 'ph': 'X', 'ts': start * 1e6, 'dur': duration * 1e6, 'pid': _pid, 'tid': ident}
+        if frame_id is not None or args:
+            event['args'] = dict(args or {})
+            if frame_id is not None:
+                event['args']['frame_id'] = frame_id
+        trace_events.append(event)
+    return {'traceEvents': trace_events, 'displayTimeUnit': 'ms', 'otherData': metadata or {}}
+
+def dump_trace(path=None, background=False, last_seconds=None, **metadata):
+    # The caller only pays for copying the buffer (or its last_seconds); with background=True the JSON
+    # is built and written on a separate thread (non-daemon, so a dump started at shutdown still
+    # completes). A background dump is skipped, returning None, while the previous one is being written.
+    global _dump_thread
+    if path is None:
+        path = os.path.join(_trace_dir, f'trace_{time.strftime("%Y%m%d_%H%M%S")}.json')
+    with _dump_lock:
+        if background and _dump_thread is not None and _dump_thread.is_alive():
+            stats['dumps_skipped'] += 1
+            return None
+        events = list(_events) if last_seconds is None else _recent_events(last_seconds)
+        thread_names = dict(_thread_names)
+        if not background:
+            _write_trace(path, metadata, events, thread_names)
+            return path
+        _dump_thread = threading.Thread(target=_write_trace, args=(path, metadata, events, thread_names),
+                                        name="TraceDump")
+        _dump_thread.start()
+    return path
+
+def _write_trace(path, metadata, events, thread_names):
+    trace = to_chrome_trace(metadata, events, thread_names)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as trace_file:
+        json.dump(trace, trace_file, default=str)
+    stats['dumps'] += 1
+
+def get_stats():
+    return dict(stats, enabled=_enabled, buffered=len(_events), buffer_size=_events.maxlen, budget_ms=_budget_ms)
+
+def _install_signal_handler():
+    # kill -USR1 <pid> dumps the buffer on demand; signal handlers can only be set from the main thread
+    if not hasattr(signal, 'SIGUSR1') or threading.current_thread() is not threading.main_thread():
+        return
+    signal.signal(signal.SIGUSR1, lambda signum, frame: print(f"Writing trace to {dump_trace(background=True)}"))
+
+if os.environ.get('DMS_TRACE') == '1':
+    enable(budget_ms=float(os.environ['DMS_TRACE_BUDGET_MS']) if os.environ.get('DMS_TRACE_BUDGET_MS') else None)
@@ -5,51 +5,23 @@ import pandas as pd
 import time
 import matplotlib.pyplot as plt
 import seaborn as sns
+from core.iris import IrisLocator
+from core.landmarks import shape_to_np
 
 # Load the predictor and the face detector
 predictor_path = "src/Models/shape_predictor_68_face_landmarks_GTX.dat"
 detector = dlib.get_frontal_face_detector()
 predictor = dlib.shape_predictor(predictor_path)
+iris_locator = IrisLocator()
 
 def midpoint(point1, point2):
     return (int((point1[0] + point2[0]) / 2), int((point1[1] + point2[1]) / 2))
 
 def get_eye_region(landmarks, eye_points):
-    return [(landmarks.part(point).x, landmarks.part(point).y) for point in eye_points]
+    return shape_to_np(landmarks)[eye_points]
 
 def get_iris_position(eye_region, frame, gray):
-    mask = np.zeros((frame.shape[0], frame.shape[1]), dtype=np.uint8)
-    cv2.fillPoly(mask, [np.array(eye_region, dtype=np.int32)], 255)
-    eye = cv2.bitwise_and(gray, gray, mask=mask)
-    
-    # Extract the bounding box of the eye region
-    min_x = np.min(np.array(eye_region)[:, 0])
-    max_x = np.max(np.array(eye_region)[:, 0])
-    min_y = np.min(np.array(eye_region)[:, 1])
-    max_y = np.max(np.array(eye_region)[:, 1])
-    eye = eye[min_y:max_y, min_x:max_x]
-    
-    eye = cv2.equalizeHist(eye)
-    # Apply adaptive thresholding
-    threshold = cv2.adaptiveThreshold(eye, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY_INV, 11, 2)
-    
-    # Apply hexagonal mask to keep only the eye region
-    mask_eye = mask[min_y:max_y, min_x:max_x]
-    eye_masked = cv2.bitwise_and(threshold, threshold, mask=mask_eye)
-    
-    contours, _ = cv2.findContours(eye_masked, cv2.RETR_TREE, cv2.CHAIN_APPROX_SIMPLE)
-    contours = sorted(contours, key=lambda x: cv2.contourArea(x), reverse=True)
-    
-    scale_factor = 10  # Scale factor to enlarge the image
-    threshold_resized = cv2.resize(eye_masked, None, fx=scale_factor, fy=scale_factor, interpolation=cv2.INTER_LINEAR)
-    cv2.imshow("Threshold", threshold_resized)
-
-    if contours:
-        cnt = contours[0]
-        (x, y, w, h) = cv2.boundingRect(cnt)
-        iris_position = (x + int(w / 2), y + int(h / 2))
-        return (iris_position[0] + min_x, iris_position[1] + min_y)
-    return None
+    return iris_locator.locate(eye_region, gray)
 
 def calibrate(calibration_points, detector, predictor):
     calibration_data = []
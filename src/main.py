@@ -1,7 +1,9 @@
 # src/main.py
 
+from core.model_registry import mark_startup
 from ui.main_ui import MainApp
 
 if __name__ == "__main__":
+    mark_startup('ui_imported')
     app = MainApp(False)
     app.MainLoop()
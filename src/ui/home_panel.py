@@ -7,8 +7,10 @@ import logging
 from core.car_calibration import calibrate
 from core.camera import Camera
 from core.face_detector import FaceDetector
-from core.eye_tracker import EyeTracker
-from core.main_core import DriverMonitoringSystem
+
+# The governor's tick interval follows a smoothed cost and moves by a millisecond or two on most ticks;
+# the timer is only restarted once it drifts further than this, since each restart resets its schedule
+TIMER_RESTART_MS = 5
 
 class HomePanel(wx.Panel):
     def __init__(self, parent, username, gaze_detection, db):
@@ -18,7 +20,8 @@ class HomePanel(wx.Panel):
         self.db = db
         self.video_writer = None
         self.timer = wx.Timer(self)
-        self.driver_monitoring_system = DriverMonitoringSystem()
+        # Shared with MainFrame so the models and camera are only set up once
+        self.driver_monitoring_system = gaze_detection
         self.Bind(wx.EVT_TIMER, self.update_frame, self.timer)
         self.init_ui()
 
@@ -96,14 +99,23 @@ class HomePanel(wx.Panel):
         self.stop_feed_button.Disable()
 
     def start_car_calibration(self, event):
+        # Calibration needs the camera to itself, so a running session is stopped first
+        if self.driver_monitoring_system.is_tracking:
+            self.stop_live_feed(event)
         camera = Camera()  # Replace with actual camera object
-        face_detector = FaceDetector()  # Replace with actual face detector object
-        eye_tracker =  EyeTracker() # Use existing eye tracker
+        # Its own detector without detect-then-track state; the models come from the shared registry
+        face_detector = FaceDetector(backend=self.driver_monitoring_system.face_detector.backend_name,
+                                     track_faces=False)
+        eye_tracker = self.driver_monitoring_system.eye_tracker
         calibrate(camera, face_detector, eye_tracker)
         camera.release()
 
     def update_frame(self, event):
         self.driver_monitoring_system.update_tracking()
+        # Slow the timer down when a tick costs more than its interval, so events never pile up
+        interval = self.driver_monitoring_system.governor.tick_interval_ms
+        if self.timer.IsRunning() and abs(interval - self.timer.GetInterval()) > TIMER_RESTART_MS:
+            self.timer.Start(interval)
 
     def flatten_gaze_data(self, data):
         flat_data = []
@@ -120,6 +132,8 @@ class HomePanel(wx.Panel):
         return flat_data
 
     def logout(self, event):
+        self.timer.Stop()
+        self.driver_monitoring_system.close()
         parent = self.GetParent()
         parent.Hide()
         from ui.login_frame import LoginFrame  # Lazy import to avoid circular dependency
@@ -3,7 +3,7 @@
 import wx
 from ui.registration_dialog import RegistrationDialog
 from ui.background_panel import BackgroundPanel  # Correct import path
-from core.cam_calibration import perform_calibration  # Ensure these are correctly imported
+from core.cam_calibration import PositionCalibration
 from utils.user_database import UserDatabase  # Ensure these are correctly imported
 
 
@@ -60,7 +60,7 @@ class LoginFrame(wx.Frame):
         username = self.username_text.GetValue()
         password = self.password_text.GetValue()
         if self.user_db.validate_user(username, password):
-            if perform_calibration():
+            if PositionCalibration().run():
                 wx.MessageBox('Calibration successful', 'Info', wx.OK | wx.ICON_INFORMATION)
                 self.Hide()
                 from ui.main_frame import MainFrame  # Lazy import to avoid circular dependency
@@ -57,7 +57,7 @@ class MainFrame(wx.Frame):
         self.dashboard_button.Bind(wx.EVT_BUTTON, self.show_dashboard)
         self.settings_button.Bind(wx.EVT_BUTTON, self.show_settings)
 
-        self.eye_tracking = DriverMonitoringSystem()
+        self.eye_tracking = DriverMonitoringSystem(username=self.username)
         self.db = Database()
 
         self.home_panel = HomePanel(self.panel, self.username, self.eye_tracking, self.db)
@@ -115,5 +115,6 @@ class MainFrame(wx.Frame):
 
         # Close the database connection
         self.db.close()
+        self.eye_tracking.close()
 
         self.Destroy()
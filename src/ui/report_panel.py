@@ -3,13 +3,11 @@
 import wx
 import os
 import subprocess
-from core.main_core import DriverMonitoringSystem
 
 class ReportPanel(wx.Panel):
     def __init__(self, parent):
         super(ReportPanel, self).__init__(parent, style=wx.TRANSPARENT_WINDOW)
         self.init_ui()
-        self.driver_monitoring_system = DriverMonitoringSystem()
 
     def init_ui(self):
         self.SetBackgroundColour(wx.Colour(255, 255, 255, 0))  # Transparent background
@@ -9,6 +9,13 @@ from scipy.ndimage import gaussian_filter
 import matplotlib.pyplot as plt
 import pandas as pd
 import plotly.express as px
+import datetime
+import sys
+
+# streamlit runs this file directly, so src/ has to be put on the path for the utils imports
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from utils.session_store import SessionStore, ROLLUP_COUNTERS
+from utils.engagement_rate import ENGAGEMENT_ZONES
 
 # Function to load report data from JSON file
 def load_report_data():
@@ -91,6 +98,43 @@ def plot_heatmap(gaze_points):
     plt.title('Driver Gaze Heatmap')
     st.pyplot(fig)
 
+# Function to plot a driver's history from the per-minute rollups
+def plot_session_history():
+    store = SessionStore()
+    users = store.get_users()
+    if not users:
+        store.close()
+        return
+
+    st.header("Driver History")
+    user = st.selectbox("Driver", users)
+    today = datetime.date.today()
+    window = st.date_input("Time window", (today - datetime.timedelta(days=90), today))
+    # While only the first end of the range has been picked, Streamlit returns a 1-tuple
+    if len(window) != 2:
+        store.close()
+        st.write("Pick an end date for the time window.")
+        return
+    start_date, end_date = window
+    start = datetime.datetime.combine(start_date, datetime.time.min).timestamp()
+    end = datetime.datetime.combine(end_date, datetime.time.max).timestamp()
+
+    rollups = store.get_minute_rollups(user, start, end)
+    sessions = store.get_sessions(user, start, end)
+    store.close()
+    if not rollups:
+        st.write("No sessions recorded in this window.")
+        return
+
+    df = pd.DataFrame(rollups, columns=['minute', 'session_id'] + ROLLUP_COUNTERS)
+    df['day'] = pd.to_datetime(df['minute'] * 60, unit='s').dt.date
+    daily = df.groupby('day')[['valid_frames'] + [f'zone_{zone}' for zone in ENGAGEMENT_ZONES]].sum()
+    road_share = (daily['zone_road'] / daily['valid_frames'].where(daily['valid_frames'] > 0)).fillna(0) * 100
+    st.write(f"**Sessions:** {len(sessions)}")
+    fig = px.line(x=road_share.index, y=road_share.values, labels={'x': 'Day', 'y': 'Road (%)'},
+                  title='Share of Valid Frames Looking at the Road')
+    st.plotly_chart(fig)
+
 # Load report data
 report_data = load_report_data()
 
@@ -119,3 +163,5 @@ if report_data:
     # Plot heatmap
     # st.header("Engagement Heatmap")
     # plot_heatmap(report_data['gaze_points'])
+
+plot_session_history()
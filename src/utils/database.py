@@ -3,28 +3,55 @@ import hashlib
 import os
 import time
 
+db_path = 'src/data/engagement_data.db'
+
+# Columns added to gaze_data after the original (user, timestamp, gaze_direction) schema
+GAZE_DATA_COLUMNS = {
+    'frame_id': 'INTEGER',
+    'ear': 'REAL',
+    'eyes_valid': 'INTEGER',
+    'alert_level': 'INTEGER',
+}
+
+def connect(path=db_path, check_same_thread=True):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)  # Ensure the directory exists
+    connection = sqlite3.connect(path, timeout=5.0, check_same_thread=check_same_thread)
+    # WAL lets the report UI read while sessions are being written; NORMAL only syncs at checkpoints,
+    # which is safe in WAL mode and avoids an fsync per transaction
+    connection.execute('PRAGMA journal_mode=WAL')
+    connection.execute('PRAGMA synchronous=NORMAL')
+    return connection
+
+def migrate_gaze_data(connection):
+    cursor = connection.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS gaze_data (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT,
+            timestamp TEXT,
+            gaze_direction TEXT
+        )
+    ''')
+
+    cursor.execute('PRAGMA table_info(gaze_data)')
+    columns = [info[1] for info in cursor.fetchall()]
+    for column, column_type in GAZE_DATA_COLUMNS.items():
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE gaze_data ADD COLUMN {column} {column_type}')
+
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_gaze_data_user_timestamp ON gaze_data (user, timestamp)')
+    connection.commit()
+
 class Database:
     def __init__(self):
-        db_path = 'src/data/engagement_data.db'
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)  # Ensure the directory exists
-        self.connection = sqlite3.connect(db_path)
+        self.connection = connect(db_path)
         self.create_tables()
 
     def create_tables(self):
         cursor = self.connection.cursor()
 
-        # Drop the table if it exists to avoid schema conflicts during testing
-        cursor.execute('DROP TABLE IF EXISTS gaze_data')
-
-        # Table for gaze data
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS gaze_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                user TEXT,
-                timestamp TEXT,
-                gaze_direction TEXT
-            )
-        ''')
+        # Table for gaze data; existing rows are kept and older schemas are upgraded in place
+        migrate_gaze_data(self.connection)
 
         # Table for user data
         cursor.execute('''
@@ -37,14 +64,13 @@ class Database:
         self.connection.commit()
 
     def log_gaze_data(self, username, gaze_data):
-        cursor = self.connection.cursor()
         timestamp = time.strftime('%Y-%m-%d %H:%M:%S')
-        for gaze_direction in gaze_data.get('gaze_direction', []):
-            cursor.execute('''
+        rows = [(username, timestamp, str(gaze_direction)) for gaze_direction in gaze_data.get('gaze_direction', [])]
+        with self.connection:
+            self.connection.executemany('''
                 INSERT INTO gaze_data (user, timestamp, gaze_direction) 
                 VALUES (?, ?, ?)
-            ''', (username, timestamp, str(gaze_direction)))
-        self.connection.commit()
+            ''', rows)
 
     def retrieve_gaze_data(self):
         cursor = self.connection.cursor()
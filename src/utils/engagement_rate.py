@@ -1,28 +1,72 @@
 import numpy as np
 
+ENGAGEMENT_ZONES = ('rearview_mirror', 'left_side_mirror', 'right_side_mirror', 'dashboard', 'road', 'other')
+
+def new_engagement_data():
+    return {zone: 0 for zone in ENGAGEMENT_ZONES}
+
+def count_engagement(engagement_data, result):
+    # Frames with valid eyes count towards their gaze zone, or 'other' when no zone matched
+    if not result.eyes_valid:
+        return
+    zone = result.gaze_zone or 'other'
+    engagement_data[zone] = engagement_data.get(zone, 0) + 1
+
+def gaze_centers(eye_positions):
+    # (2, P, 2) for one frame or (N, 2, P, 2) for a batch -> (2,) or (N, 2)
+    eyes = np.asarray(eye_positions, dtype=np.float64)
+    return eyes.mean(axis=-2).mean(axis=-2)
+
+class GazeZoneClassifier:
+    # Calibration zones compiled once into a centroid matrix; classification is a single
+    # vectorised nearest-centroid lookup that also takes a whole batch of frames.
+    def __init__(self, calibration_points, use_kdtree=False):
+        zone_names = []
+        centroids = []
+        for point, positions in calibration_points.items():
+            if positions is None:
+                continue
+            samples = positions if point == 'road' else [positions]
+            for sample in samples:
+                zone_names.append(point)
+                centroids.append(gaze_centers(sample))
+
+        self.zone_names = np.array(zone_names, dtype=object)
+        self.centroids = np.array(centroids, dtype=np.float64).reshape(-1, 2)
+        self.kdtree = None
+        if use_kdtree and len(self.centroids):
+            from scipy.spatial import cKDTree
+            self.kdtree = cKDTree(self.centroids)
+
+    def nearest(self, centers):
+        centers = np.atleast_2d(centers)
+        if self.kdtree is not None:
+            _, indices = self.kdtree.query(centers)
+            return indices
+        distances = ((centers[:, None, :] - self.centroids[None, :, :]) ** 2).sum(axis=2)
+        return distances.argmin(axis=1)
+
+    def classify(self, eye_positions):
+        if eye_positions is None or len(self.centroids) == 0:
+            return None
+        return self.zone_names[self.nearest(gaze_centers(eye_positions))[0]]
+
+    def classify_batch(self, eye_positions=None, centers=None):
+        if centers is None:
+            centers = gaze_centers(eye_positions)
+        if len(self.centroids) == 0:
+            return np.full(len(centers), None, dtype=object)
+        return self.zone_names[self.nearest(centers)]
+
+_compiled_classifier = (None, None)
+
 def calculate_engagement_rate(eye_positions, calibration_points):
+    global _compiled_classifier
     if eye_positions is None or calibration_points is None:
         return None
 
-    left_eye, right_eye = eye_positions
-    gaze_center = (np.mean(left_eye, axis=0) + np.mean(right_eye, axis=0)) / 2
-
-    min_distance = float('inf')
-    closest_point = None
-    for point, positions in calibration_points.items():
-        if point == 'road':
-            for road_point in positions:
-                road_center = (np.mean(road_point[0], axis=0) + np.mean(road_point[1], axis=0)) / 2
-                distance = np.linalg.norm(gaze_center - road_center)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_point = point
-        else:
-            if positions is not None:
-                point_center = (np.mean(positions[0], axis=0) + np.mean(positions[1], axis=0)) / 2
-                distance = np.linalg.norm(gaze_center - point_center)
-                if distance < min_distance:
-                    min_distance = distance
-                    closest_point = point
-
-    return closest_point
+    compiled_for, classifier = _compiled_classifier
+    if compiled_for is not calibration_points:
+        classifier = GazeZoneClassifier(calibration_points)
+        _compiled_classifier = (calibration_points, classifier)
+    return classifier.classify(eye_positions)
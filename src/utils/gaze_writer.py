@@ -0,0 +1,104 @@
+import queue
+import threading
+import time
+from utils.database import migrate_gaze_data, db_path
+from utils.engagement_rate import gaze_centers
+from utils.session_store import SessionStore
+
+def format_timestamp(timestamp):
+    # Millisecond precision that still sorts and compares with the older '%Y-%m-%d %H:%M:%S' rows
+    return time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(timestamp)) + f".{int(timestamp % 1 * 1000):03d}"
+
+class GazeEventWriter:
+    # Persists per-frame gaze events from a background thread. log() only puts a tuple on a queue;
+    # the worker flushes whatever has accumulated every flush_interval seconds (or max_batch events)
+    # as one executemany transaction on its own connection. If the disk falls behind and the queue
+    # fills up, new events are dropped and counted rather than blocking the monitoring loop.
+    # Events logged while session_id is set also go to the session store's samples and rollups.
+    def __init__(self, path=db_path, flush_interval=0.25, max_batch=1000, max_queue=10000):
+        self.path = path
+        self.session_id = None
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.queue = queue.Queue(maxsize=max_queue)
+        self.stats = {'queued': 0, 'written': 0, 'dropped': 0, 'batches': 0, 'errors': 0, 'flush_seconds': 0.0}
+        self._thread = None
+        self._running = False
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._worker, name="GazeEventWriter", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        # Whatever is still queued is written before the thread exits
+        if self._thread is None:
+            return
+        self._running = False
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def log(self, username, result):
+        gaze_x = gaze_y = None
+        if result.eyes_valid:
+            gaze_x, gaze_y = (float(v) for v in gaze_centers([result.left_eye, result.right_eye]))
+        event = (username, self.session_id, result.timestamp, result.gaze_zone, result.frame_id, result.ear,
+                 int(result.eyes_valid), result.alert_level, gaze_x, gaze_y)
+        try:
+            self.queue.put_nowait(event)
+            self.stats['queued'] += 1
+        except queue.Full:
+            self.stats['dropped'] += 1
+
+    def _collect(self, deadline):
+        batch = []
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.queue.get(timeout=max(remaining, 0)) if remaining > 0 else self.queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _worker(self):
+        store = SessionStore(self.path)
+        migrate_gaze_data(store.connection)
+        while self._running or not self.queue.empty():
+            batch = self._collect(time.monotonic() + (self.flush_interval if self._running else 0))
+            if batch:
+                self._flush(store, batch)
+        store.close()
+
+    def _flush(self, store, batch):
+        rows = []
+        sessions = {}
+        for username, session_id, timestamp, zone, frame_id, ear, eyes_valid, alert_level, gaze_x, gaze_y in batch:
+            rows.append((username, format_timestamp(timestamp), zone, frame_id, ear, eyes_valid, alert_level))
+            if session_id is not None:
+                sessions.setdefault((username, session_id), []).append(
+                    (frame_id, timestamp, zone, ear, gaze_x, gaze_y, eyes_valid))
+        start = time.perf_counter()
+        try:
+            with store.connection:
+                store.connection.executemany('''
+                    INSERT INTO gaze_data (user, timestamp, gaze_direction, frame_id, ear, eyes_valid, alert_level)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                ''', rows)
+                for (username, session_id), samples in sessions.items():
+                    store.write_samples(username, session_id, samples, commit=False)
+        except Exception as e:
+            self.stats['errors'] += 1
+            print(f"Error writing gaze events: {e}")
+            return
+        self.stats['flush_seconds'] += time.perf_counter() - start
+        self.stats['written'] += len(rows)
+        self.stats['batches'] += 1
+
+    def get_stats(self):
+        stats = dict(self.stats)
+        stats['pending'] = self.queue.qsize()
+        stats['mean_batch_size'] = stats['written'] / stats['batches'] if stats['batches'] else 0.0
+        stats['mean_flush_ms'] = stats['flush_seconds'] * 1000 / stats['batches'] if stats['batches'] else 0.0
+        return stats
@@ -0,0 +1,112 @@
+import threading
+from collections import deque
+from utils.engagement_rate import ENGAGEMENT_ZONES, new_engagement_data, count_engagement
+from utils.metrics_report import build_report_data, engagement_score
+
+class MetricsAccumulator:
+    # Session metrics kept up to date one frame at a time, in constant time per frame.
+    # Each frame's zone is credited with the time until the next frame arrives (capped at max_frame_gap,
+    # so a stall is not counted as dwell), which makes dwell times follow real timestamps
+    # instead of assuming a uniform frame time. Safe to query from another thread while updating.
+    def __init__(self, window_seconds=60, max_frame_gap=1.0, recent_glances=100):
+        self.window_seconds = window_seconds
+        self.max_frame_gap = max_frame_gap
+        self.recent_glances = recent_glances
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.frames = 0
+            self.engagement_data = new_engagement_data()
+            self.dwell = dict.fromkeys(ENGAGEMENT_ZONES, 0.0)
+            self.eyes_missing_time = 0.0
+            self.elapsed = 0.0
+            self.first_timestamp = None
+            self.last_timestamp = None
+            self.last_zone = None
+            # Consecutive-glance tracking: the zone being looked at and when that glance began
+            self.glance_zone = None
+            self.glance_start = None
+            self.glances = {zone: {'count': 0, 'total': 0.0, 'longest': 0.0} for zone in ENGAGEMENT_ZONES}
+            self.glance_history = deque(maxlen=self.recent_glances)
+            # Rolling window of (timestamp, zone, seconds) with running per-zone sums
+            self.window = deque()
+            self.window_dwell = dict.fromkeys(ENGAGEMENT_ZONES, 0.0)
+            self.window_elapsed = 0.0
+
+    def update(self, result):
+        zone = (result.gaze_zone or 'other') if result.eyes_valid else None
+        timestamp = result.timestamp
+        with self._lock:
+            if self.last_timestamp is None:
+                self.first_timestamp = timestamp
+            else:
+                seconds = min(max(timestamp - self.last_timestamp, 0.0), self.max_frame_gap)
+                self._credit(self.last_zone, seconds, timestamp)
+            if zone != self.glance_zone:
+                self._end_glance(timestamp)
+                self.glance_zone = zone
+                self.glance_start = timestamp
+            self.frames += 1
+            count_engagement(self.engagement_data, result)
+            self.last_timestamp = timestamp
+            self.last_zone = zone
+
+    def _credit(self, zone, seconds, timestamp):
+        self.elapsed += seconds
+        if zone is None:
+            self.eyes_missing_time += seconds
+        else:
+            self.dwell[zone] += seconds
+            self.window_dwell[zone] += seconds
+        self.window_elapsed += seconds
+        self.window.append((timestamp, zone, seconds))
+        cutoff = timestamp - self.window_seconds
+        while self.window and self.window[0][0] < cutoff:
+            _, old_zone, old_seconds = self.window.popleft()
+            self.window_elapsed -= old_seconds
+            if old_zone is not None:
+                self.window_dwell[old_zone] -= old_seconds
+
+    def _end_glance(self, timestamp):
+        if self.glance_zone is None:
+            return
+        duration = timestamp - self.glance_start
+        glance = self.glances[self.glance_zone]
+        glance['count'] += 1
+        glance['total'] += duration
+        glance['longest'] = max(glance['longest'], duration)
+        self.glance_history.append((self.glance_zone, self.glance_start, duration))
+
+    def rolling_score(self):
+        with self._lock:
+            return engagement_score(self.window_dwell, self.window_elapsed)
+
+    def dwell_totals(self):
+        # (dwell per zone, eyes-missing seconds, elapsed seconds) as one consistent reading
+        with self._lock:
+            return dict(self.dwell), self.eyes_missing_time, self.elapsed
+
+    def report(self, total_time=None):
+        # Same fields as generate_metrics_report's report_data, from measured dwell times
+        with self._lock:
+            return build_report_data(dict(self.dwell), self.elapsed if total_time is None else total_time)
+
+    def snapshot(self):
+        with self._lock:
+            current = None
+            if self.glance_zone is not None:
+                current = {'zone': self.glance_zone, 'seconds': self.last_timestamp - self.glance_start}
+            snapshot = build_report_data(dict(self.dwell), self.elapsed)
+            snapshot.update({
+                'frames': self.frames,
+                'engagement_data': dict(self.engagement_data),
+                'eyes_missing_time': self.eyes_missing_time,
+                'rolling_engagement_score': engagement_score(self.window_dwell, self.window_elapsed),
+                'rolling_window_seconds': self.window_seconds,
+                'glances': {zone: dict(glance) for zone, glance in self.glances.items()},
+                'current_glance': current,
+                'recent_glances': list(self.glance_history),
+            })
+            return snapshot
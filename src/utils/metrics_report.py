@@ -1,69 +1,96 @@
 # src/utils/metrics_report.py
 
-import matplotlib.pyplot as plt
 import json
+import os
+import threading
 
-def generate_metrics_report(engagement_data, total_time, frame_count):
-    frame_time = total_time / frame_count
+def generate_metrics_report(engagement_data, total_time, frame_count, report_file_path='src/data/report_data.json',
+                            chart_dir='src/data', make_charts=True, verbose=True):
+    frame_time = total_time / frame_count if frame_count else 0.0
 
     # Calculate total time and percentages
     total_engagement_time = {stimulus: count * frame_time for stimulus, count in engagement_data.items()}
-    total_engagement = sum(total_engagement_time.values())
-    engagement_percentage = {stimulus: (time / total_engagement) * 100 for stimulus, time in total_engagement_time.items()}
+    report_data = build_report_data(total_engagement_time, total_time)
+    write_report_data(report_data, report_file_path)
+
+    if verbose:
+        print_metrics_report(report_data)
+    if make_charts:
+        render_charts(report_data['engagement_percentage'], report_data['total_engagement_time'], chart_dir)
+    return report_data
 
-    # Calculate engagement scores
-    engagement_score = 100
+def engagement_score(total_engagement_time, total_time):
+    score = 100
     for stimulus, time in total_engagement_time.items():
         if stimulus != 'road':
-            engagement_score -= (time / total_time) * 100
-            if time > 5:  # Example rule: if time on non-road stimuli exceeds 5 seconds consecutively, decrease score
-                engagement_score -= (time - 5) / total_time * 100
-    engagement_score = max(engagement_score, 0)
+            if total_time:
+                score -= (time / total_time) * 100
+            if time > 5 and total_time:  # Example rule: if time on non-road stimuli exceeds 5 seconds consecutively, decrease score
+                score -= (time - 5) / total_time * 100
+    return max(score, 0)
+
+def build_report_data(total_engagement_time, total_time):
+    total_engagement = sum(total_engagement_time.values())
+    engagement_percentage = {stimulus: (time / total_engagement) * 100 if total_engagement else 0.0 for stimulus, time in total_engagement_time.items()}
 
     # Find most and least engaged stimuli
     most_engaged_stimulus = max(engagement_percentage, key=engagement_percentage.get)
     least_engaged_stimulus = min(engagement_percentage, key=engagement_percentage.get)
 
-    # Save data to a JSON file for use by Streamlit
-    report_data = {
+    # Saved to a JSON file for use by Streamlit
+    return {
         'engagement_percentage': engagement_percentage,
         'total_time': total_time,
-        'engagement_score': engagement_score,
+        'engagement_score': engagement_score(total_engagement_time, total_time),
         'most_engaged_stimulus': most_engaged_stimulus,
         'least_engaged_stimulus': least_engaged_stimulus,
         'total_engagement_time': total_engagement_time,
-        
     }
-    report_file_path = 'src/data/report_data.json'
+
+def write_report_data(report_data, report_file_path='src/data/report_data.json'):
+    os.makedirs(os.path.dirname(report_file_path) or '.', exist_ok=True)
     with open(report_file_path, 'w') as report_file:
         json.dump(report_data, report_file)
 
-    # Print the metrics report
+def print_metrics_report(report_data):
+    engagement_percentage = report_data['engagement_percentage']
+    most_engaged_stimulus = report_data['most_engaged_stimulus']
+    least_engaged_stimulus = report_data['least_engaged_stimulus']
     print("\nEngagement Metrics Report:")
     print("----------------------------")
     for stimulus, percentage in engagement_percentage.items():
         print(f"{stimulus}: {percentage:.2f}%")
-    print(f"\nTotal tracking time: {total_time:.2f} seconds")
-    print(f"Engagement score: {engagement_score:.2f}%")
+    print(f"\nTotal tracking time: {report_data['total_time']:.2f} seconds")
+    print(f"Engagement score: {report_data['engagement_score']:.2f}%")
     print(f"Most engaged stimulus: {most_engaged_stimulus} ({engagement_percentage[most_engaged_stimulus]:.2f}%)")
     print(f"Least engaged stimulus: {least_engaged_stimulus} ({engagement_percentage[least_engaged_stimulus]:.2f}%)")
 
+def render_charts(engagement_percentage, total_engagement_time, chart_dir='src/data'):
+    # Figure objects rather than pyplot, so charts can be rendered from a background thread
+    from matplotlib.figure import Figure
+
     # Plot vertical bar chart for engagement percentages
-    plt.figure(figsize=(10, 6))
-    plt.bar(engagement_percentage.keys(), engagement_percentage.values(), color='skyblue')
-    plt.xlabel('Stimuli')
-    plt.ylabel('Engagement Percentage')
-    plt.title('Engagement Percentage by Stimuli')
-    plt.tight_layout()
-    plt.savefig('src/data/engagement_percentage.png')
-    plt.close()
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.bar(list(engagement_percentage.keys()), list(engagement_percentage.values()), color='skyblue')
+    ax.set_xlabel('Stimuli')
+    ax.set_ylabel('Engagement Percentage')
+    ax.set_title('Engagement Percentage by Stimuli')
+    fig.tight_layout()
+    fig.savefig(os.path.join(chart_dir, 'engagement_percentage.png'))
 
     # Plot horizontal bar chart for total engagement time
-    plt.figure(figsize=(10, 6))
-    plt.barh(list(total_engagement_time.keys()), list(total_engagement_time.values()), color='lightgreen')
-    plt.xlabel('Time (seconds)')
-    plt.ylabel('Stimuli')
-    plt.title('Total Engagement Time by Stimuli')
-    plt.tight_layout()
-    plt.savefig('src/data/engagement_time.png')
-    plt.close()
+    fig = Figure(figsize=(10, 6))
+    ax = fig.subplots()
+    ax.barh(list(total_engagement_time.keys()), list(total_engagement_time.values()), color='lightgreen')
+    ax.set_xlabel('Time (seconds)')
+    ax.set_ylabel('Stimuli')
+    ax.set_title('Total Engagement Time by Stimuli')
+    fig.tight_layout()
+    fig.savefig(os.path.join(chart_dir, 'engagement_time.png'))
+
+def render_charts_async(engagement_percentage, total_engagement_time, chart_dir='src/data'):
+    thread = threading.Thread(target=render_charts, args=(engagement_percentage, total_engagement_time, chart_dir),
+                              name="ReportCharts")
+    thread.start()
+    return thread
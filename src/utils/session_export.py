@@ -0,0 +1,130 @@
+import json
+import os
+import numpy as np
+from utils.engagement_rate import ENGAGEMENT_ZONES, gaze_centers
+
+# One .npy file per column. Zones are stored as uint8 codes into ENGAGEMENT_ZONES;
+# NO_ZONE marks frames without valid eyes, and missing floats are NaN.
+ZONE_CODES = {zone: code for code, zone in enumerate(ENGAGEMENT_ZONES)}
+NO_ZONE = 255
+
+COLUMNS = {
+    'ts': np.float64,
+    'frame_id': np.int64,
+    'zone': np.uint8,
+    'ear': np.float32,
+    'gaze_x': np.float32,
+    'gaze_y': np.float32,
+    'alert_level': np.uint8,
+}
+
+# Fixed header size so the row count can be rewritten in place when a chunk is appended
+NPY_HEADER_SIZE = 128
+
+def _npy_header(dtype, length):
+    header = repr({'descr': np.lib.format.dtype_to_descr(np.dtype(dtype)), 'fortran_order': False, 'shape': (length,)})
+    magic = np.lib.format.magic(1, 0)
+    padding = NPY_HEADER_SIZE - len(magic) - 2 - len(header) - 1
+    return magic + (NPY_HEADER_SIZE - len(magic) - 2).to_bytes(2, 'little') + header.encode('latin1') + b' ' * padding + b'\n'
+
+class SessionExporter:
+    # Appends one row per frame into preallocated column buffers and writes them out chunk by chunk.
+    # Each column is a plain .npy file whose header is kept current after every chunk, so a session
+    # can be memory-mapped with np.load(mmap_mode='r') while it is still being recorded.
+    def __init__(self, directory, chunk_size=1024, metadata=None):
+        self.directory = directory
+        self.chunk_size = chunk_size
+        self.metadata = metadata or {}
+        self.length = 0
+        self._buffers = {name: np.empty(chunk_size, dtype=dtype) for name, dtype in COLUMNS.items()}
+        self._buffered = 0
+        self._files = None
+
+    def open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        self._files = {}
+        for name, dtype in COLUMNS.items():
+            column_file = open(os.path.join(self.directory, f'{name}.npy'), 'wb+')
+            column_file.write(_npy_header(dtype, 0))
+            self._files[name] = column_file
+        self._write_metadata()
+
+    def append(self, result):
+        if self._files is None:
+            self.open()
+        i = self._buffered
+        buffers = self._buffers
+        buffers['ts'][i] = result.timestamp
+        buffers['frame_id'][i] = result.frame_id
+        buffers['zone'][i] = ZONE_CODES.get(result.gaze_zone or 'other', NO_ZONE) if result.eyes_valid else NO_ZONE
+        buffers['ear'][i] = np.nan if result.ear is None else result.ear
+        if result.eyes_valid:
+            buffers['gaze_x'][i], buffers['gaze_y'][i] = gaze_centers([result.left_eye, result.right_eye])
+        else:
+            buffers['gaze_x'][i] = buffers['gaze_y'][i] = np.nan
+        buffers['alert_level'][i] = result.alert_level or 0
+        self._buffered += 1
+        if self._buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        if self._files is None or not self._buffered:
+            return
+        self.length += self._buffered
+        for name, column_file in self._files.items():
+            column_file.seek(0, os.SEEK_END)
+            column_file.write(self._buffers[name][:self._buffered].tobytes())
+            column_file.seek(0)
+            column_file.write(_npy_header(COLUMNS[name], self.length))
+            column_file.flush()
+        self._buffered = 0
+        self._write_metadata()
+
+    def _write_metadata(self):
+        metadata = dict(self.metadata, frames=self.length, zones=list(ENGAGEMENT_ZONES), no_zone=NO_ZONE)
+        with open(os.path.join(self.directory, 'session.json'), 'w') as metadata_file:
+            json.dump(metadata, metadata_file)
+
+    def close(self):
+        self.flush()
+        if self._files is not None:
+            for column_file in self._files.values():
+                column_file.close()
+            self._files = None
+
+def _load_column(path, dtype):
+    # A session that has not flushed its first chunk yet (or crashed before it) has zero rows, and
+    # a zero-length array cannot be memory-mapped; such columns come back as empty arrays instead
+    with open(path, 'rb') as column_file:
+        try:
+            np.lib.format.read_magic(column_file)
+            shape, _, _ = np.lib.format.read_array_header_1_0(column_file)
+        except ValueError:
+            return np.empty(0, dtype=dtype)
+    if not shape or shape[0] == 0:
+        return np.empty(0, dtype=dtype)
+    return np.load(path, mmap_mode='r')
+
+def load_session(directory, columns=None):
+    # Memory-mapped, so nothing is read until a column is actually used
+    names = columns or list(COLUMNS)
+    return {name: _load_column(os.path.join(directory, f'{name}.npy'), COLUMNS[name]) for name in names}
+
+def find_sessions(root):
+    sessions = []
+    for dirpath, _, filenames in os.walk(root):
+        if 'session.json' in filenames:
+            sessions.append(dirpath)
+    return sorted(sessions)
+
+def export_npz(directory, path):
+    # Single compressed file for moving a finished session off the vehicle
+    np.savez_compressed(path, **{name: np.asarray(column) for name, column in load_session(directory).items()})
+
+def fleet_zone_counts(root):
+    # Frames per gaze zone over every session under root; only the zone column is touched
+    counts = np.zeros(NO_ZONE + 1, dtype=np.int64)
+    for directory in find_sessions(root):
+        zones = load_session(directory, ['zone'])['zone']
+        counts += np.bincount(zones, minlength=NO_ZONE + 1)
+    return {zone: int(counts[code]) for zone, code in ZONE_CODES.items()}
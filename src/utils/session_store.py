@@ -0,0 +1,149 @@
+from utils.database import connect, db_path
+from utils.engagement_rate import ENGAGEMENT_ZONES
+
+ROLLUP_COUNTERS = ['frames', 'valid_frames', 'ear_sum', 'ear_count'] + [f'zone_{zone}' for zone in ENGAGEMENT_ZONES]
+
+def migrate_session_tables(connection):
+    cursor = connection.cursor()
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sessions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            user TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            ended_at REAL,
+            frames INTEGER DEFAULT 0,
+            engagement_score REAL
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sessions_user_started ON sessions (user, started_at)')
+
+    # One row per processed frame, clustered by session and frame so a session reads back sequentially
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS samples (
+            session_id INTEGER NOT NULL,
+            frame_id INTEGER NOT NULL,
+            ts REAL NOT NULL,
+            zone TEXT,
+            ear REAL,
+            gaze_x REAL,
+            gaze_y REAL,
+            PRIMARY KEY (session_id, frame_id)
+        ) WITHOUT ROWID
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_samples_session_ts ON samples (session_id, ts)')
+
+    # Per-minute counters kept up to date as samples are written, so history reports never scan samples
+    counter_columns = ',\n'.join(f'            {column} {"REAL" if column == "ear_sum" else "INTEGER"} DEFAULT 0'
+                                 for column in ROLLUP_COUNTERS)
+    cursor.execute(f'''
+        CREATE TABLE IF NOT EXISTS minute_rollups (
+            user TEXT NOT NULL,
+            minute INTEGER NOT NULL,
+            session_id INTEGER NOT NULL,
+{counter_columns},
+            PRIMARY KEY (user, minute, session_id)
+        ) WITHOUT ROWID
+    ''')
+
+    cursor.execute('PRAGMA table_info(minute_rollups)')
+    columns = [info[1] for info in cursor.fetchall()]
+    for column in ROLLUP_COUNTERS:
+        if column not in columns:
+            cursor.execute(f'ALTER TABLE minute_rollups ADD COLUMN {column} INTEGER DEFAULT 0')
+    connection.commit()
+
+def rollup_samples(user, session_id, samples):
+    # samples: (frame_id, ts, zone, ear, gaze_x, gaze_y, eyes_valid) -> one counter row per minute
+    rollups = {}
+    for _, ts, zone, ear, _, _, eyes_valid in samples:
+        minute = int(ts // 60)
+        counters = rollups.get(minute)
+        if counters is None:
+            counters = rollups[minute] = dict.fromkeys(ROLLUP_COUNTERS, 0)
+        counters['frames'] += 1
+        if eyes_valid:
+            counters['valid_frames'] += 1
+            counters[f"zone_{zone or 'other'}"] += 1
+        if ear is not None:
+            counters['ear_sum'] += ear
+            counters['ear_count'] += 1
+    return [(user, minute, session_id, *[counters[column] for column in ROLLUP_COUNTERS])
+            for minute, counters in sorted(rollups.items())]
+
+class SessionStore:
+    # Sessions, their per-frame samples and per-minute rollups, all in engagement_data.db.
+    # Timestamps are epoch seconds; every query is a range scan on (user, time) or (session, time).
+    def __init__(self, path=db_path, check_same_thread=True):
+        self.connection = connect(path, check_same_thread=check_same_thread)
+        migrate_session_tables(self.connection)
+
+    def start_session(self, user, started_at):
+        with self.connection:
+            cursor = self.connection.execute('INSERT INTO sessions (user, started_at) VALUES (?, ?)', (user, started_at))
+        return cursor.lastrowid
+
+    def end_session(self, session_id, ended_at, frames, engagement_score=None):
+        with self.connection:
+            self.connection.execute('UPDATE sessions SET ended_at = ?, frames = ?, engagement_score = ? WHERE id = ?',
+                                    (ended_at, frames, engagement_score, session_id))
+
+    def write_samples(self, user, session_id, samples, commit=True):
+        self.connection.executemany('''
+            INSERT OR REPLACE INTO samples (session_id, frame_id, ts, zone, ear, gaze_x, gaze_y)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', [(session_id, *sample[:6]) for sample in samples])
+        updates = ', '.join(f'{column} = {column} + excluded.{column}' for column in ROLLUP_COUNTERS)
+        placeholders = ', '.join('?' * (3 + len(ROLLUP_COUNTERS)))
+        self.connection.executemany(f'''
+            INSERT INTO minute_rollups (user, minute, session_id, {', '.join(ROLLUP_COUNTERS)})
+            VALUES ({placeholders})
+            ON CONFLICT (user, minute, session_id) DO UPDATE SET {updates}
+        ''', rollup_samples(user, session_id, samples))
+        if commit:
+            self.connection.commit()
+
+    def get_sessions(self, user, start=None, end=None):
+        # Sessions that overlap [start, end]
+        cursor = self.connection.execute('''
+            SELECT id, user, started_at, ended_at, frames, engagement_score FROM sessions
+            WHERE user = ? AND started_at <= ? AND COALESCE(ended_at, started_at) >= ?
+            ORDER BY started_at
+        ''', (user, float('inf') if end is None else end, float('-inf') if start is None else start))
+        return cursor.fetchall()
+
+    def get_samples(self, user, start, end):
+        cursor = self.connection.execute('''
+            SELECT samples.session_id, samples.frame_id, samples.ts, samples.zone, samples.ear, samples.gaze_x, samples.gaze_y
+            FROM sessions JOIN samples ON samples.session_id = sessions.id
+            WHERE sessions.user = ? AND samples.ts BETWEEN ? AND ?
+            ORDER BY samples.ts
+        ''', (user, start, end))
+        return cursor.fetchall()
+
+    def get_minute_rollups(self, user, start=None, end=None):
+        start_minute = -2 ** 62 if start is None else int(start // 60)
+        end_minute = 2 ** 62 if end is None else int(end // 60)
+        cursor = self.connection.execute(f'''
+            SELECT minute, session_id, {', '.join(ROLLUP_COUNTERS)} FROM minute_rollups
+            WHERE user = ? AND minute BETWEEN ? AND ?
+            ORDER BY minute
+        ''', (user, start_minute, end_minute))
+        return cursor.fetchall()
+
+    def get_engagement_data(self, user, start=None, end=None):
+        # Same shape as DriverMonitoringSystem.engagement_data, summed over the window from the rollups
+        start_minute = -2 ** 62 if start is None else int(start // 60)
+        end_minute = 2 ** 62 if end is None else int(end // 60)
+        totals = ', '.join(f'COALESCE(SUM(zone_{zone}), 0)' for zone in ENGAGEMENT_ZONES)
+        cursor = self.connection.execute(f'''
+            SELECT {totals}, COALESCE(SUM(frames), 0) FROM minute_rollups
+            WHERE user = ? AND minute BETWEEN ? AND ?
+        ''', (user, start_minute, end_minute))
+        row = cursor.fetchone()
+        return dict(zip(ENGAGEMENT_ZONES, row[:-1])), row[-1]
+
+    def get_users(self):
+        return [row[0] for row in self.connection.execute('SELECT DISTINCT user FROM sessions ORDER BY user')]
+
+    def close(self):
+        self.connection.close()